@@ -0,0 +1,333 @@
+"""Benchmarks for the hot paths across the repository, with fixed inputs and seeds.
+
+    # run everything, saving the results as a baseline
+    python benchmarks/run_benchmarks.py run --output baseline.json
+    # after a change, run again and flag anything more than 20% slower
+    python benchmarks/run_benchmarks.py run --output new.json --baseline baseline.json
+    # or compare two saved runs
+    python benchmarks/run_benchmarks.py compare new.json baseline.json
+
+Each benchmark also records a summary of what it computed (the suggested word, the
+number of matches, ...), which must match the baseline exactly, so an optimization
+that changes results is caught as well as one that is slower.
+"""
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "puzzle_solver"))
+sys.path.insert(0, str(ROOT_DIR / "scrabble"))
+sys.path.insert(0, str(ROOT_DIR))
+
+import pandas as pd  # noqa: E402
+
+from wordle.wordlebot import (  # noqa: E402
+    WordState,
+    WordleBot,
+    FrequencyWordScorer,
+    BruteForceWordScorer,
+    FastBruteForceWordScorer,
+    MinimaxWordScorer,
+    AbsurdleHost,
+    generate_guess_response,
+)
+from puzzle_solver import GridState, TILES  # noqa: E402
+from puzzle_generator import generate_puzzle  # noqa: E402
+import scrabble_cheat  # noqa: E402
+from pattern_query import PatternIndex  # noqa: E402
+
+WORDLE_RESOURCE_DIR = ROOT_DIR / "wordle" / "resources"
+SCRABBLE_DICTIONARY = ROOT_DIR / "scrabble" / scrabble_cheat.dictionary
+SEED = 0
+# the brute force scorers are O(n^3) in the vocabulary, so use a fixed sample of it
+BRUTE_FORCE_VOCAB_SIZE = 60
+# true word for the turn 2 benchmarks, as an index into the (sampled) vocabulary
+TRUE_WORD_INDEX = 7
+# (letters, form) from easy to worst case: two blanks and every position open
+SCRABBLE_CASES = {
+    "no_blanks": ("retains", "_______"),
+    "one_blank": ("retain.", "_______"),
+    "two_blanks": ("retai..", "_______"),
+    "two_blanks_board": ("etao..", "__s___"),
+}
+# the same cases for 5 letter words, when the 5 letter wordle words stand in for the
+# scrabble dictionary
+FALLBACK_SCRABBLE_CASES = {
+    "no_blanks": ("crate", "_____"),
+    "one_blank": ("crat.", "_____"),
+    "two_blanks": ("cra..", "_____"),
+    "two_blanks_board": ("eto..", "__a__"),
+}
+# (pattern, rack, limit) for the pattern query engine, over lengths 2 to 15
+PATTERN_QUERY_CASES = {
+    "first_results": ("*", None, 10),
+    "all": ("*e*", None, None),
+    "rack": ("?*s*", "etaoin.", None),
+}
+
+# a benchmark does its setup and returns the function to time, which returns a
+# summary of its result
+Benchmark = Callable[[], Callable[[], object]]
+
+
+def _read_words(filename: str) -> List[str]:
+    return list(pd.read_csv(WORDLE_RESOURCE_DIR / filename, names=["word"]).word.values)
+
+
+def _wordle_suggest(
+    scorer_name: str, turn: int, hard_mode: bool = False
+) -> Benchmark:
+    def setup():
+        words = _read_words("word-bank.csv")
+        if scorer_name == "frequency":
+            scorer = FrequencyWordScorer()
+        elif scorer_name == "minimax":
+            scorer = MinimaxWordScorer(words)
+        else:
+            words = sorted(random.Random(SEED).sample(words, BRUTE_FORCE_VOCAB_SIZE))
+            if scorer_name == "fast_brute_force":
+                scorer = FastBruteForceWordScorer(words)
+            else:
+                scorer = BruteForceWordScorer()
+        bot = WordleBot(
+            word_to_freq={word: 1 for word in words},
+            word_scorer=scorer,
+            hard_mode=hard_mode,
+        )
+        if turn == 2:
+            with contextlib.redirect_stdout(io.StringIO()):
+                first_guess = bot.suggest()
+            bot.guess(generate_guess_response(first_guess, words[TRUE_WORD_INDEX]))
+        return bot.suggest
+
+    return setup
+
+
+def _wordle_possible_words(guesses: List[str]) -> Benchmark:
+    def setup():
+        words = _read_words("valid-words.csv")
+        word_state = WordState()
+        for guess in guesses:
+            word_state.update_state(generate_guess_response(guess, "mouse"))
+        return lambda: len(word_state.get_possible_words(words))
+
+    return setup
+
+
+def _absurdle_respond(guesses: List[str]) -> Benchmark:
+    def setup():
+        words = _read_words("word-bank.csv")
+
+        def run():
+            # the host is cheap to create, its state changes with every guess
+            host = AbsurdleHost(words)
+            for guess in guesses:
+                host.respond(guess)
+            return len(host.candidates)
+
+        return run
+
+    return setup
+
+
+def _scrabble_matching_words(letters: str, form: str, dictionary: str) -> Benchmark:
+    def setup():
+        words = scrabble_cheat.load_dictionary(dictionary)
+        return lambda: sorted(scrabble_cheat.matching_words(letters, form, words))[:10]
+
+    return setup
+
+
+def _scrabble_pattern_query(
+    pattern: str, rack: Optional[str], limit: Optional[int], dictionary: str
+) -> Benchmark:
+    def setup():
+        index = PatternIndex(scrabble_cheat.load_dictionary(dictionary))
+
+        def run():
+            words = list(index.query(pattern, 2, 15, rack=rack, limit=limit))
+            return [len(words)] + words[:10]
+
+        return run
+
+    return setup
+
+
+def _puzzle_run_check(dx: int, dy: int, seed: Optional[int]) -> Benchmark:
+    def setup():
+        if seed is None:
+            tiles = TILES
+        else:
+            tiles, _ = generate_puzzle(dx, dy, symbols="ABCDEFGH", seed=seed)
+
+        def run():
+            gs = GridState(dx=dx, dy=dy, tiles=tiles)
+            gs.run_check(count_only=True)
+            return gs._solutions_found
+
+        return run
+
+    return setup
+
+
+def get_benchmarks(scrabble_dictionary: Optional[str] = None) -> Dict[str, Benchmark]:
+    scrabble_cases = SCRABBLE_CASES
+    if scrabble_dictionary is None:
+        if SCRABBLE_DICTIONARY.exists():
+            scrabble_dictionary = str(SCRABBLE_DICTIONARY)
+        else:
+            # the scrabble dictionary isn't in the repository; the 5 letter wordle
+            # words still exercise the search over racks and blanks
+            scrabble_dictionary = str(WORDLE_RESOURCE_DIR / "valid-words.csv")
+            scrabble_cases = FALLBACK_SCRABBLE_CASES
+    benchmarks: Dict[str, Benchmark] = {}
+    for scorer_name in ["frequency", "fast_brute_force", "brute_force", "minimax"]:
+        for turn in [1, 2]:
+            benchmarks[f"wordle_suggest_turn{turn}_{scorer_name}"] = _wordle_suggest(
+                scorer_name, turn
+            )
+        benchmarks[f"wordle_suggest_turn2_{scorer_name}_hard_mode"] = _wordle_suggest(
+            scorer_name, 2, hard_mode=True
+        )
+    benchmarks["absurdle_respond_first_guess"] = _absurdle_respond(["cares"])
+    benchmarks["absurdle_respond_game"] = _absurdle_respond(
+        ["cares", "doily", "thumb", "pygmy"]
+    )
+    benchmarks["wordle_possible_words_initial"] = _wordle_possible_words([])
+    benchmarks["wordle_possible_words_after_guess"] = _wordle_possible_words(["cares"])
+    for case, (letters, form) in scrabble_cases.items():
+        benchmarks[f"scrabble_matching_words_{case}"] = _scrabble_matching_words(
+            letters, form, scrabble_dictionary
+        )
+    for case, (pattern, rack, limit) in PATTERN_QUERY_CASES.items():
+        benchmarks[f"scrabble_pattern_query_{case}"] = _scrabble_pattern_query(
+            pattern, rack, limit, scrabble_dictionary
+        )
+    benchmarks["puzzle_run_check_3x3"] = _puzzle_run_check(3, 3, None)
+    benchmarks["puzzle_run_check_4x4_seed0"] = _puzzle_run_check(4, 4, SEED)
+    return benchmarks
+
+
+def run_benchmark(name: str, benchmark: Benchmark, repeat: int) -> Dict:
+    """Time a benchmark 'repeat' times after setup.  Output from the benchmarked code
+    (including tqdm progress bars) is discarded."""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+        io.StringIO()
+    ):
+        run = benchmark()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+    return {
+        "name": name,
+        "seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+        "repeat": repeat,
+        "result": result,
+    }
+
+
+def compare_to_baseline(
+    results: List[Dict], baseline: List[Dict], threshold: float
+) -> List[str]:
+    """Compare results to a baseline run.  Results must match exactly; the best time
+    may regress by at most 'threshold'."""
+    errors = []
+    baseline_by_name = {b["name"]: b for b in baseline}
+    for result in results:
+        if result["name"] not in baseline_by_name:
+            print(f"{result['name']}: no baseline, skipping comparison")
+            continue
+        base = baseline_by_name[result["name"]]
+        if result["result"] != base["result"]:
+            errors.append(
+                f"{result['name']}: result {result['result']!r}, baseline result "
+                f"{base['result']!r}"
+            )
+        if result["seconds"] > base["seconds"] * (1 + threshold):
+            errors.append(
+                f"{result['name']}: took {result['seconds']:.4f}s, "
+                f"baseline took {base['seconds']:.4f}s"
+            )
+    return errors
+
+
+def print_results(results: List[Dict], baseline: Optional[List[Dict]] = None):
+    baseline_by_name = {b["name"]: b for b in baseline or []}
+    print(f"{'benchmark':>48s} {'seconds':>10s} {'mean':>10s} {'baseline':>10s}")
+    for result in results:
+        base = baseline_by_name.get(result["name"])
+        base_seconds = f"{base['seconds']:10.4f}" if base else f"{'-':>10s}"
+        print(
+            f"{result['name']:>48s} {result['seconds']:10.4f} "
+            f"{result['mean_seconds']:10.4f} {base_seconds}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        help="only run benchmarks whose names start with one of these",
+    )
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--scrabble_dictionary",
+        help="word list for the scrabble benchmarks, by default the scrabble "
+        "dictionary if present, otherwise the wordle word list",
+    )
+    run_parser.add_argument("--output", help="write results to this JSON file")
+    run_parser.add_argument("--baseline", help="compare against this JSON results file")
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare saved results to a baseline"
+    )
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    for subparser in [run_parser, compare_parser]:
+        subparser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="allowed fractional slowdown relative to the baseline",
+        )
+    args = parser.parse_args()
+
+    baseline = None
+    if args.command == "run":
+        results = []
+        for name, benchmark in get_benchmarks(args.scrabble_dictionary).items():
+            if args.benchmarks and not any(name.startswith(b) for b in args.benchmarks):
+                continue
+            result = run_benchmark(name, benchmark, args.repeat)
+            results.append(result)
+            print(f"{name}: {result['seconds']:.4f}s", flush=True)
+        if args.output:
+            with open(args.output, "w") as fp:
+                json.dump(results, fp, indent=2)
+    else:
+        with open(args.results) as fp:
+            results = json.load(fp)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+
+    errors = []
+    if baseline is not None:
+        errors = compare_to_baseline(results, baseline, args.threshold)
+    print()
+    print_results(results, baseline)
+    for error in errors:
+        print(f"FAILED: {error}")
+    sys.exit(1 if errors else 0)
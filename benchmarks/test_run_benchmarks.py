@@ -0,0 +1,47 @@
+from run_benchmarks import get_benchmarks, run_benchmark, compare_to_baseline
+
+
+def test_run_benchmark():
+    benchmarks = get_benchmarks()
+    assert "wordle_suggest_turn2_brute_force" in benchmarks
+    result = run_benchmark("puzzle_run_check_3x3", benchmarks["puzzle_run_check_3x3"], 2)
+    assert result["result"] == 8
+    assert result["repeat"] == 2
+    assert 0 < result["seconds"] <= result["mean_seconds"]
+
+    result = run_benchmark(
+        "wordle_possible_words_after_guess",
+        benchmarks["wordle_possible_words_after_guess"],
+        1,
+    )
+    assert 0 < result["result"] < 12972
+
+    # the scrabble cases must find words, whichever dictionary is in use
+    for name, benchmark in benchmarks.items():
+        if name.startswith("scrabble_matching_words"):
+            assert run_benchmark(name, benchmark, 1)["result"], name
+
+
+def test_compare_to_baseline():
+    baseline = [
+        {"name": "a", "seconds": 1.0, "result": 3},
+        {"name": "b", "seconds": 1.0, "result": "word"},
+    ]
+    results = [
+        {"name": "a", "seconds": 1.1, "result": 3},
+        {"name": "b", "seconds": 0.5, "result": "word"},
+        {"name": "c", "seconds": 9.0, "result": 0},
+    ]
+    assert compare_to_baseline(results, baseline, threshold=0.2) == []
+
+    results[0]["seconds"] = 1.5
+    results[1]["result"] = "other"
+    errors = compare_to_baseline(results, baseline, threshold=0.2)
+    assert len(errors) == 2
+    assert errors[0].startswith("a: took")
+    assert errors[1].startswith("b: result")
+
+
+if __name__ == "__main__":
+    test_run_benchmark()
+    test_compare_to_baseline()
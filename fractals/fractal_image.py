@@ -0,0 +1,220 @@
+"""Headless image output for the fractal scripts: SVG paths and PNG rasters
+written with numpy and zlib only, so no display or imaging library is needed.
+Streams of line segments are drawn a chunk at a time, so they can be any length."""
+from typing import Iterable, Iterator, List, Optional, Tuple
+import itertools
+import struct
+import zlib
+
+import numpy as np
+
+# RGB values for the Tk colour names used by the turtle scripts
+COLOR_RGB = {
+    "white": (255, 255, 255),
+    "black": (0, 0, 0),
+    "red": (255, 0, 0),
+    "green": (0, 128, 0),
+    "blue": (0, 0, 255),
+    "yellow": (255, 255, 0),
+    "orange": (255, 165, 0),
+    "purple": (160, 32, 240),
+    "violet": (238, 130, 238),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255),
+}
+
+# a polyline (N x 2 array of points in turtle coordinates) and its colour name
+Layer = Tuple[np.ndarray, str]
+# chunks of line segments ((N, 4) arrays of x0, y0, x1, y1 in turtle coordinates) and
+# their colour name
+SegmentLayer = Tuple[Iterable[np.ndarray], str]
+# segments per chunk when drawing a stream of segments
+SEGMENT_CHUNK_SIZE = 16384
+
+
+def to_image_coords(points: np.ndarray, width: int, height: int, scale: float):
+    """Turtle coordinates (origin at the centre, y up) to image pixel coordinates"""
+    x = points[:, 0] * scale + width / 2
+    y = height / 2 - points[:, 1] * scale
+    return x, y
+
+
+def segment_chunks(
+    segments: Iterable[Tuple[float, float, float, float]],
+    chunk_size: int = SEGMENT_CHUNK_SIZE,
+) -> Iterator[np.ndarray]:
+    """Group a stream of (x0, y0, x1, y1) segments into (N, 4) arrays of at most
+    chunk_size rows, so a stream of any length is drawn in bounded memory"""
+    segments = iter(segments)
+    while True:
+        chunk = np.array(list(itertools.islice(segments, chunk_size)), dtype=float)
+        if len(chunk) == 0:
+            return
+        yield chunk.reshape(-1, 4)
+
+
+def polyline_segments(points: np.ndarray) -> np.ndarray:
+    """(N - 1, 4) array of the segments joining an N x 2 array of points"""
+    return np.hstack([points[:-1], points[1:]])
+
+
+def _svg_path_data(
+    chunk: np.ndarray,
+    previous_end: Optional[Tuple[float, float]],
+    width: int,
+    height: int,
+    scale: float,
+) -> str:
+    """SVG path data for a chunk of segments, starting a new subpath wherever a
+    segment doesn't start at the end of the one before"""
+    x0, y0 = to_image_coords(chunk[:, :2], width, height, scale)
+    x1, y1 = to_image_coords(chunk[:, 2:], width, height, scale)
+    breaks = np.ones(len(chunk), dtype=bool)
+    breaks[1:] = np.any(chunk[1:, :2] != chunk[:-1, 2:], axis=1)
+    breaks[0] = previous_end is None or tuple(chunk[0, :2]) != previous_end
+    ends = np.empty(2 * len(chunk))
+    ends[0::2] = x1
+    ends[1::2] = y1
+    # runs of connected segments; the first may continue the previous chunk's subpath
+    bounds = np.unique(np.concatenate([[0], np.flatnonzero(breaks), [len(chunk)]]))
+    pieces = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if breaks[start]:
+            pieces.append("M%.2f,%.2f L" % (x0[start], y0[start]))
+        # points after an L are implicitly more L commands
+        coords = tuple(ends[2 * start : 2 * end])
+        pieces.append(("%.2f,%.2f " * (end - start)) % coords)
+    return "".join(pieces)
+
+
+def write_svg(
+    path: str,
+    layers: Iterable[SegmentLayer],
+    width: int,
+    height: int,
+    scale: float = 1.0,
+    background: str = "white",
+):
+    """Write each layer as an SVG path, a chunk of segments at a time"""
+    with open(path, "w") as fp:
+        fp.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+            f'height="{height}" viewBox="0 0 {width} {height}">\n'
+        )
+        fp.write(f'<rect width="100%" height="100%" fill="{background}"/>\n')
+        for chunks, color in layers:
+            fp.write(f'<path fill="none" stroke="{color}" d="')
+            previous_end = None
+            for chunk in chunks:
+                fp.write(_svg_path_data(chunk, previous_end, width, height, scale))
+                previous_end = tuple(chunk[-1, 2:])
+            fp.write('"/>\n')
+        fp.write("</svg>\n")
+
+
+def rasterize_segments(
+    image: np.ndarray,
+    x0: np.ndarray,
+    y0: np.ndarray,
+    x1: np.ndarray,
+    y1: np.ndarray,
+    color: str,
+):
+    """Draw 1 pixel wide segments, given in pixel coordinates, into an (H, W, 3) uint8
+    image.  Each segment is sampled about once per pixel including both ends, with all
+    segments processed at once."""
+    height, width, _ = image.shape
+    dx = x1 - x0
+    dy = y1 - y0
+    n_samples = np.ceil(np.hypot(dx, dy)).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(dx)), n_samples)
+    # position of each sample along its segment, from 0 to 1
+    first_sample = np.cumsum(n_samples) - n_samples
+    t = (np.arange(len(segment)) - first_sample[segment]) / np.maximum(
+        n_samples[segment] - 1, 1
+    )
+    px = np.floor(x0[segment] + dx[segment] * t).astype(np.int64)
+    py = np.floor(y0[segment] + dy[segment] * t).astype(np.int64)
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    image[py[inside], px[inside]] = COLOR_RGB[color]
+
+
+def rasterize_polyline(
+    image: np.ndarray, points: np.ndarray, color: str, scale: float = 1.0
+):
+    """Draw a 1 pixel wide polyline, given in turtle coordinates, into an (H, W, 3)
+    uint8 image"""
+    height, width, _ = image.shape
+    x, y = to_image_coords(points, width, height, scale)
+    rasterize_segments(image, x[:-1], y[:-1], x[1:], y[1:], color)
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    """Encode an (H, W, 3) uint8 image as an 8 bit RGB PNG"""
+    height, width, _ = image.shape
+    # each row starts with filter type 0 (none)
+    raw = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, 3 * width)
+
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + chunk_type
+            + data
+            + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+        )
+
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)),
+            chunk(b"IEND", b""),
+        ]
+    )
+
+
+def write_png(path: str, image: np.ndarray):
+    """Write an (H, W, 3) uint8 image as an 8 bit RGB PNG"""
+    with open(path, "wb") as fp:
+        fp.write(encode_png(image))
+
+
+def write_segment_image(
+    path: str,
+    layers: Iterable[SegmentLayer],
+    width: int,
+    height: int,
+    scale: float = 1.0,
+    background: str = "white",
+):
+    """Write layers of segment chunks to an SVG or PNG file, depending on the
+    extension of path.  Only one chunk of segments is held at a time."""
+    if path.lower().endswith(".svg"):
+        write_svg(path, layers, width, height, scale=scale, background=background)
+    elif path.lower().endswith(".png"):
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        image[:, :] = COLOR_RGB[background]
+        for chunks, color in layers:
+            for chunk in chunks:
+                x0, y0 = to_image_coords(chunk[:, :2], width, height, scale)
+                x1, y1 = to_image_coords(chunk[:, 2:], width, height, scale)
+                rasterize_segments(image, x0, y0, x1, y1, color)
+        write_png(path, image)
+    else:
+        raise ValueError(f"Unknown image format for {path}, use .svg or .png")
+
+
+def write_image(
+    path: str,
+    layers: List[Layer],
+    width: int,
+    height: int,
+    scale: float = 1.0,
+    background: str = "white",
+):
+    """Write polyline layers to an SVG or PNG file, see write_segment_image"""
+    segment_layers = (([polyline_segments(points)], color) for points, color in layers)
+    write_segment_image(
+        path, segment_layers, width, height, scale=scale, background=background
+    )
@@ -0,0 +1,84 @@
+"""Vectorized Koch curve geometry.  Rather than recursing segment by segment like
+koch_curve in turtle_fractals.py, each order replaces every segment of the current
+vertex array by four at once."""
+from typing import Tuple
+
+import numpy as np
+
+# rotating a segment by +60 degrees (a turtle left turn) gives the peak of the bump
+_ROTATE_60 = np.array(
+    [[np.cos(np.pi / 3), -np.sin(np.pi / 3)], [np.sin(np.pi / 3), np.cos(np.pi / 3)]]
+)
+
+
+def subdivide(points: np.ndarray) -> np.ndarray:
+    """Apply one Koch step to a polyline: each segment a -> b becomes four segments
+    with a bump on the left, like koch_curve with order 1."""
+    start = points[:-1]
+    third = (points[1:] - start) / 3
+    new_points = np.empty((4 * len(start) + 1, 2))
+    new_points[0:-1:4] = start
+    new_points[1::4] = start + third
+    new_points[2::4] = start + third + third @ _ROTATE_60.T
+    new_points[3::4] = start + 2 * third
+    new_points[-1] = points[-1]
+    return new_points
+
+
+def koch_curve_points(
+    order: int, start: Tuple[float, float], end: Tuple[float, float]
+) -> np.ndarray:
+    """Vertices of the Koch curve of the given order from start to end"""
+    points = np.array([start, end], dtype=np.float64)
+    for _ in range(order):
+        points = subdivide(points)
+    return points
+
+
+def koch_snowflake_points(
+    order: int, size: float, start: Tuple[float, float] = (0.0, 0.0)
+) -> np.ndarray:
+    """Vertices of the snowflake drawn by koch_snowflake: a turtle starting at start,
+    heading east, drawing three Koch curves with a right turn of 120 degrees after
+    each.  The first and last vertex are both start."""
+    headings = np.radians([0.0, -120.0, -240.0])
+    corners = np.empty((4, 2))
+    corners[0] = start
+    for idx, heading in enumerate(headings):
+        corners[idx + 1] = corners[idx] + size * np.array(
+            [np.cos(heading), np.sin(heading)]
+        )
+    points = corners
+    for _ in range(order):
+        points = subdivide(points)
+    return points
+
+
+def subdivide_segments(
+    starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """One Koch step for separate segments (N x 2 start and end points), for when
+    segments have been culled and no longer form a polyline.  Returns 4N segments."""
+    third = (ends - starts) / 3
+    points = np.stack(
+        [
+            starts,
+            starts + third,
+            starts + third + third @ _ROTATE_60.T,
+            starts + 2 * third,
+            ends,
+        ],
+        axis=1,
+    )
+    return points[:, :-1].reshape(-1, 2), points[:, 1:].reshape(-1, 2)
+
+
+def bounding_boxes(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Bounding box (x_min, y_min, x_max, y_max) of the Koch curve of any order
+    built on each segment.  The curve stays within the triangle on the segment with
+    its apex at the peak of the first bump, sqrt(3) / 6 of the length to the left."""
+    direction = ends - starts
+    left = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+    apex = (starts + ends) / 2 + left * (np.sqrt(3) / 6)
+    corners = np.stack([starts, ends, apex])
+    return np.concatenate([corners.min(axis=0), corners.max(axis=0)], axis=1)
@@ -0,0 +1,228 @@
+"""L-systems: fractals described by an axiom, production rules and a turn angle.
+
+Expansion is streamed depth first with a stack of at most order + 1 rule iterators, so
+the expanded string is never built; a Koch snowflake of order 15 is over 3 billion
+symbols but expands in constant memory.  Renderers (turtle, SVG/PNG) consume the stream
+of turtle commands or line segments.
+"""
+from typing import Dict, Iterator, List, Tuple
+from dataclasses import dataclass
+import argparse
+import math
+
+import numpy as np
+
+# (name, argument), name is one of forward, move, left, right, push, pop
+Command = Tuple[str, float]
+# (x0, y0, x1, y1)
+Segment = Tuple[float, float, float, float]
+
+
+@dataclass
+class LSystem:
+    axiom: str
+    rules: Dict[str, str]
+    # turn angle in degrees, + turns left and - turns right
+    angle: float
+    # symbols that draw a line forward
+    draw_symbols: str = "F"
+    # symbols that move forward without drawing
+    move_symbols: str = "f"
+    # how much smaller a step gets each order, so that the figure keeps its size
+    scale_per_order: float = 1.0
+
+    def step_size(self, size: float, order: int) -> float:
+        """Step for each forward symbol so an axiom step of size keeps its size"""
+        return size / self.scale_per_order**order
+
+
+KOCH_CURVE = LSystem(axiom="F", rules={"F": "F+F--F+F"}, angle=60, scale_per_order=3)
+# a Koch curve on each side of a triangle, turning right 120 degrees after each side
+KOCH_SNOWFLAKE = LSystem(
+    axiom="F--F--F--", rules={"F": "F+F--F+F"}, angle=60, scale_per_order=3
+)
+# the outline of the Sierpinski gasket: F draws the outer triangle and G the inner ones
+SIERPINSKI_TRIANGLE = LSystem(
+    axiom="F+G+G",
+    rules={"F": "F+G-F-G+F", "G": "GG"},
+    angle=120,
+    draw_symbols="FG",
+    scale_per_order=2,
+)
+SIERPINSKI_ARROWHEAD = LSystem(
+    axiom="A",
+    rules={"A": "B-A-B", "B": "A+B+A"},
+    angle=60,
+    draw_symbols="AB",
+    scale_per_order=2,
+)
+
+SYSTEMS = {
+    "koch_curve": KOCH_CURVE,
+    "koch_snowflake": KOCH_SNOWFLAKE,
+    "sierpinski_triangle": SIERPINSKI_TRIANGLE,
+    "sierpinski_arrowhead": SIERPINSKI_ARROWHEAD,
+}
+
+
+def expand(lsystem: LSystem, order: int) -> Iterator[str]:
+    """Yield the symbols of the order-th rewrite of the axiom, one at a time.
+
+    Each stack entry is an iterator over a rule body and the number of rewrites still
+    to apply to its symbols.  A symbol with a rule is replaced by pushing its body, and
+    the parent iterator picks up where it left off once the body is used up.
+    """
+    rules = lsystem.rules
+    stack: List[Tuple[Iterator[str], int]] = [(iter(lsystem.axiom), order)]
+    while stack:
+        symbols, depth = stack[-1]
+        for symbol in symbols:
+            if depth > 0 and symbol in rules:
+                stack.append((iter(rules[symbol]), depth - 1))
+                break
+            yield symbol
+        else:
+            stack.pop()
+
+
+def commands(lsystem: LSystem, order: int, step: float) -> Iterator[Command]:
+    """Yield turtle commands for the order-th expansion.  Symbols with no meaning
+    for the turtle are skipped."""
+    actions = {"+": ("left", lsystem.angle), "-": ("right", lsystem.angle)}
+    actions["["] = ("push", 0.0)
+    actions["]"] = ("pop", 0.0)
+    for symbol in lsystem.draw_symbols:
+        actions[symbol] = ("forward", step)
+    for symbol in lsystem.move_symbols:
+        actions[symbol] = ("move", step)
+    for symbol in expand(lsystem, order):
+        action = actions.get(symbol)
+        if action is not None:
+            yield action
+
+
+def segments(
+    lsystem: LSystem,
+    order: int,
+    step: float,
+    start: Tuple[float, float] = (0.0, 0.0),
+    heading: float = 0.0,
+) -> Iterator[Segment]:
+    """Yield the line segments drawn by a turtle at start with the given heading (in
+    degrees, 0 is east) following commands()"""
+    x, y = start
+    directions: Dict[float, Tuple[float, float]] = {}
+    stack: List[Tuple[float, float, float]] = []
+    for name, value in commands(lsystem, order, step):
+        if name == "forward" or name == "move":
+            direction = directions.get(heading)
+            if direction is None:
+                rad = math.radians(heading)
+                direction = directions[heading] = (math.cos(rad), math.sin(rad))
+            new_x = x + value * direction[0]
+            new_y = y + value * direction[1]
+            if name == "forward":
+                yield (x, y, new_x, new_y)
+            x, y = new_x, new_y
+        elif name == "left":
+            heading = (heading + value) % 360
+        elif name == "right":
+            heading = (heading - value) % 360
+        elif name == "push":
+            stack.append((x, y, heading))
+        elif name == "pop":
+            x, y, heading = stack.pop()
+
+
+def polylines(
+    lsystem: LSystem,
+    order: int,
+    step: float,
+    start: Tuple[float, float] = (0.0, 0.0),
+    heading: float = 0.0,
+) -> Iterator[np.ndarray]:
+    """Join the segments into polylines, one N x 2 vertex array for each run of
+    connected segments.  A run is held in memory whole, and the Koch and Sierpinski
+    systems are a single run, so to draw high orders use segments() instead."""
+    points: List[float] = []
+    last = None
+    for x0, y0, x1, y1 in segments(lsystem, order, step, start, heading):
+        if last != (x0, y0):
+            if len(points) > 2:
+                yield np.array(points).reshape(-1, 2)
+            points = [x0, y0]
+        points.append(x1)
+        points.append(y1)
+        last = (x1, y1)
+    if len(points) > 2:
+        yield np.array(points).reshape(-1, 2)
+
+
+def draw_turtle(t, turtle_commands: Iterator[Command]):
+    """Follow a stream of commands with a turtle.Turtle"""
+    stack = []
+    for name, value in turtle_commands:
+        if name == "forward":
+            t.forward(value)
+        elif name == "left":
+            t.left(value)
+        elif name == "right":
+            t.right(value)
+        elif name == "move":
+            t.penup()
+            t.forward(value)
+            t.pendown()
+        elif name == "push":
+            stack.append((t.position(), t.heading()))
+        elif name == "pop":
+            position, heading = stack.pop()
+            t.penup()
+            t.goto(position)
+            t.setheading(heading)
+            t.pendown()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--system", default="koch_snowflake", choices=SYSTEMS.keys())
+    parser.add_argument("--order", default=3, type=int)
+    parser.add_argument("--size", default=200, type=float, help="length of a side")
+    parser.add_argument("--color", default="blue")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="write an .svg or .png file instead of drawing with turtle",
+    )
+    parser.add_argument(
+        "--image_size", default=600, type=int, help="width and height of --output"
+    )
+    args = parser.parse_args()
+
+    lsystem = SYSTEMS[args.system]
+    step = lsystem.step_size(args.size, args.order)
+    start = (-args.size / 2, -args.size / 2)
+
+    if args.output is not None:
+        from fractal_image import segment_chunks, write_segment_image
+
+        lines = segments(lsystem, args.order, step, start=start)
+        write_segment_image(
+            args.output,
+            [(segment_chunks(lines), args.color)],
+            args.image_size,
+            args.image_size,
+        )
+    else:
+        import turtle
+
+        t = turtle.Turtle()
+        t.speed(0)
+        window = turtle.Screen()
+        window.bgcolor("white")
+        t.color(args.color)
+        t.penup()
+        t.goto(*start)
+        t.pendown()
+        draw_turtle(t, commands(lsystem, args.order, step))
+        window.exitonclick()
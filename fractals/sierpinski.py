@@ -1,4 +1,18 @@
-import turtle
+import argparse
+
+from lsystem import SIERPINSKI_TRIANGLE, commands, draw_turtle, segments
+
+
+# Fill colour of the triangles of each degree
+COLORMAP = [
+    "blue",
+    "red",
+    "green",
+    "white",
+    "yellow",
+    "violet",
+    "orange",
+]
 
 
 # Function to draw a triangle
@@ -16,16 +30,7 @@ def draw_triangle(points, color, t):
 
 # Recursive function to create the Sierpinski Gasket
 def sierpinski(points, degree, t):
-    colormap = [
-        "blue",
-        "red",
-        "green",
-        "white",
-        "yellow",
-        "violet",
-        "orange",
-    ]  # List of colors
-    draw_triangle(points, colormap[degree], t)  # Draws the main triangle
+    draw_triangle(points, COLORMAP[degree], t)  # Draws the main triangle
     if degree > 0:
         # Calculate the midpoints of each side of the triangle
         mid1 = midpoint(points[0], points[1])
@@ -43,17 +48,69 @@ def midpoint(point1, point2):
     return [(point1[0] + point2[0]) / 2, (point1[1] + point2[1]) / 2]
 
 
-# Set up the turtle
-t = turtle.Turtle()
-t.speed(0)
-window = turtle.Screen()
-window.bgcolor("white")
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--degree", default=5, type=int)
+    parser.add_argument(
+        "--lsystem",
+        action="store_true",
+        help="draw the outline from the Sierpinski L-system rules instead of filled "
+        "triangles",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="write the L-system outline to an .svg or .png file instead of drawing "
+        "with turtle",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="precompute the visible triangles and draw them with screen updates "
+        "batched",
+    )
+    parser.add_argument(
+        "--batch",
+        default=500,
+        type=int,
+        help="with --fast, update the screen after this many triangles (0: only at "
+        "the end)",
+    )
+    args = parser.parse_args()
+
+    # Define the vertices of the large outer triangle
+    points = [[-200, -100], [0, 200], [200, -100]]
+
+    if args.output is not None:
+        from fractal_image import segment_chunks, write_segment_image
+
+        step = SIERPINSKI_TRIANGLE.step_size(400, args.degree)
+        lines = segments(SIERPINSKI_TRIANGLE, args.degree, step, points[0])
+        write_segment_image(args.output, [(segment_chunks(lines), "blue")], 600, 600)
+    else:
+        import turtle
+
+        # Set up the turtle
+        t = turtle.Turtle()
+        t.speed(0)
+        window = turtle.Screen()
+        window.bgcolor("white")
 
-# Define the vertices of the large outer triangle
-points = [[-200, -100], [0, 200], [200, -100]]
+        if args.fast:
+            from turtle_replay import TurtleReplay, sierpinski_shapes
 
-# Draw the Sierpinski Gasket with a specified depth (degree of recursion)
-sierpinski(points, 5, t)
+            replay = TurtleReplay(t, window, batch=args.batch)
+            replay.polygons(sierpinski_shapes(points, args.degree, COLORMAP))
+        elif args.lsystem:
+            step = SIERPINSKI_TRIANGLE.step_size(400, args.degree)
+            t.penup()
+            t.goto(*points[0])
+            t.pendown()
+            draw_turtle(t, commands(SIERPINSKI_TRIANGLE, args.degree, step))
+        else:
+            # Draw the Sierpinski Gasket with a specified depth (degree of recursion)
+            sierpinski(points, args.degree, t)
 
-# Close window on click
-window.exitonclick()
+        # Close window on click
+        window.exitonclick()
@@ -0,0 +1,152 @@
+"""Raster Sierpinski gasket, coloured by degree like sierpinski.py, computed per pixel
+and written tile by tile into a memory mapped PPM by a pool of processes.  Memory use
+is bounded by the tile size rather than the image size, so gigapixel images are fine.
+
+The triangle fills the image: bottom left and bottom right at the bottom corners and
+the apex at the top middle.  A pixel centre at (u, v) in triangle coordinates, with
+v the height above the base and u + v <= 1 inside, is scaled to integers U and V with
+PRECISION_BITS bits.  The corner sub-triangles of each triangle are those where U and
+V share no 1 bits, which is the Pascal's triangle mod 2 pattern; the middle hole at
+the level of bit c is where the lower bits of U and V add up with a carry into bit c.
+So the highest bit of the carries (U + V) ^ U ^ V gives the level of the hole a pixel
+falls in, and so the degree of the smallest triangle drawn over it.  PRECISION_BITS is
+well beyond the degree so that truncating u and v never drops a carry that decides a
+hole within the requested degree.
+"""
+from typing import Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import os
+
+import numpy as np
+
+from fractal_image import COLOR_RGB
+from sierpinski import COLORMAP
+
+PRECISION_BITS = 52
+# 3 x 1024 x 1024 bytes of output per tile, plus a few int64 work arrays
+DEFAULT_TILE_SIZE = 1024
+
+# x0, y0, x1, y1 in pixels
+Box = Tuple[int, int, int, int]
+
+
+def gasket_degrees(box: Box, width: int, height: int, degree: int) -> np.ndarray:
+    """Degree of the smallest triangle covering each pixel in box, -1 outside the
+    outer triangle"""
+    x0, y0, x1, y1 = box
+    px = np.arange(x0, x1) + 0.5
+    py = np.arange(y0, y1) + 0.5
+    v = 1.0 - py[:, np.newaxis] / height
+    u = px[np.newaxis, :] / width - v / 2
+    scale = float(2**PRECISION_BITS)
+    U = np.floor(u * scale).astype(np.int64)
+    V = np.floor(v * scale).astype(np.int64)
+    total = U + V
+    inside = (U >= 0) & (V >= 0) & (total < 2**PRECISION_BITS)
+    carries = total ^ U ^ V
+    # frexp gives carries = m * 2**e with 0.5 <= m < 1, so the highest bit is e - 1
+    highest_carry = np.frexp(carries.astype(np.float64))[1] - 1
+    # a hole at bit c is (PRECISION_BITS - 1 - c) levels below the outer triangle
+    level = PRECISION_BITS - 1 - highest_carry
+    degrees = np.where(carries > 0, np.maximum(degree - level, 0), 0)
+    return np.where(inside, degrees, -1)
+
+
+def palette(background: str = "white") -> np.ndarray:
+    """RGB colour for each degree, cycling through COLORMAP, with the background
+    colour last so that index -1 picks it"""
+    colors = [COLOR_RGB[color] for color in COLORMAP] + [COLOR_RGB[background]]
+    return np.array(colors, dtype=np.uint8)
+
+
+def degrees_to_rgb(degrees: np.ndarray, background: str = "white") -> np.ndarray:
+    """RGB image for the degrees from gasket_degrees, cycling through the colormap
+    for degrees beyond its length and using the background colour outside (-1)"""
+    colors = palette(background)
+    n_colors = len(colors) - 1
+    return colors[np.where(degrees >= 0, degrees % n_colors, n_colors)]
+
+
+def ppm_header(width: int, height: int) -> bytes:
+    return f"P6\n{width} {height}\n255\n".encode("ascii")
+
+
+def create_ppm(path: str, width: int, height: int) -> int:
+    """Create an empty (sparse) binary PPM file, returning the pixel data offset"""
+    header = ppm_header(width, height)
+    with open(path, "wb") as fp:
+        fp.write(header)
+        fp.truncate(len(header) + 3 * width * height)
+    return len(header)
+
+
+def render_tile(
+    path: str, offset: int, width: int, height: int, box: Box, degree: int
+) -> int:
+    """Render one tile into the PPM at path, returning the number of pixels"""
+    x0, y0, x1, y1 = box
+    degrees = gasket_degrees(box, width, height, degree)
+    image = np.memmap(
+        path, dtype=np.uint8, mode="r+", offset=offset, shape=(height, width, 3)
+    )
+    image[y0:y1, x0:x1] = degrees_to_rgb(degrees)
+    image.flush()
+    del image
+    return (x1 - x0) * (y1 - y0)
+
+
+def tiles(width: int, height: int, tile_size: int):
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            yield (x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height))
+
+
+def render(
+    path: str,
+    width: int,
+    height: int,
+    degree: int,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    n_workers: Optional[int] = None,
+):
+    """Render the gasket to a PPM file at path.  With n_workers=1 tiles are rendered
+    in this process, otherwise by a process pool (default: one worker per CPU)."""
+    offset = create_ppm(path, width, height)
+    boxes = list(tiles(width, height, tile_size))
+    if n_workers == 1:
+        for box in boxes:
+            render_tile(path, offset, width, height, box, degree)
+        return
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(render_tile, path, offset, width, height, box, degree)
+            for box in boxes
+        ]
+        for future in as_completed(futures):
+            # raise any error from the workers
+            future.result()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default="sierpinski.ppm")
+    parser.add_argument("--width", default=4096, type=int)
+    parser.add_argument("--height", default=None, type=int, help="default: width")
+    parser.add_argument("--degree", default=5, type=int)
+    parser.add_argument("--tile_size", default=DEFAULT_TILE_SIZE, type=int)
+    parser.add_argument(
+        "--workers", default=None, type=int, help="default: one per CPU"
+    )
+    args = parser.parse_args()
+
+    height = args.height if args.height is not None else args.width
+    render(
+        args.output,
+        args.width,
+        height,
+        args.degree,
+        tile_size=args.tile_size,
+        n_workers=args.workers or os.cpu_count(),
+    )
@@ -0,0 +1,81 @@
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from turtle_fractals import koch_curve, koch_snowflake
+from koch_geometry import koch_curve_points, koch_snowflake_points
+from fractal_image import write_image
+
+
+class RecordingTurtle:
+    """Just enough of the turtle interface to record the vertices koch_curve visits"""
+
+    def __init__(self, x=0.0, y=0.0):
+        self.heading = 0.0
+        self.points = [(x, y)]
+
+    def forward(self, distance):
+        x, y = self.points[-1]
+        rad = math.radians(self.heading)
+        self.points.append((x + distance * math.cos(rad), y + distance * math.sin(rad)))
+
+    def left(self, angle):
+        self.heading += angle
+
+    def right(self, angle):
+        self.heading -= angle
+
+
+def test_koch_curve_points():
+    for order in range(5):
+        t = RecordingTurtle()
+        koch_curve(t, order, 300)
+        points = koch_curve_points(order, (0, 0), (300, 0))
+        assert points.shape == (4**order + 1, 2)
+        assert np.allclose(points, t.points)
+
+
+def test_koch_snowflake_points():
+    t = RecordingTurtle(-100, 100)
+    koch_snowflake(t, 3, 200)
+    points = koch_snowflake_points(3, 200, (-100, 100))
+    assert np.allclose(points, t.points)
+    assert np.allclose(points[0], points[-1])
+
+
+def test_write_image(tmp_path):
+    layers = [(koch_snowflake_points(order, 200, (-100, 100)), "red") for order in range(3)]
+    svg_path = str(tmp_path / "koch.svg")
+    write_image(svg_path, layers, 300, 200, scale=0.5)
+    with open(svg_path) as fp:
+        svg = fp.read()
+    assert svg.count("<path") == 3
+
+    png_path = str(tmp_path / "koch.png")
+    write_image(png_path, layers, 300, 200, scale=0.5)
+    with open(png_path, "rb") as fp:
+        png = fp.read()
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", png[16:24])
+    assert (width, height) == (300, 200)
+    # decode the single IDAT chunk and check some pixels were drawn in red
+    idat_len = struct.unpack(">I", png[33:37])[0]
+    raw = zlib.decompress(png[41 : 41 + idat_len])
+    rows = np.frombuffer(raw, dtype=np.uint8).reshape(height, 1 + 3 * width)
+    image = rows[:, 1:].reshape(height, width, 3)
+    red = np.all(image == (255, 0, 0), axis=2)
+    assert red.any()
+    # the snowflake starts at turtle (-100, 100), pixel (100, 50) at half scale
+    assert red[50, 100]
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    test_koch_curve_points()
+    test_koch_snowflake_points()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_write_image(pathlib.Path(tmp_dir))
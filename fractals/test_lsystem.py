@@ -0,0 +1,116 @@
+import itertools
+import pathlib
+import re
+import tempfile
+
+import numpy as np
+
+from lsystem import (
+    LSystem,
+    KOCH_CURVE,
+    KOCH_SNOWFLAKE,
+    SIERPINSKI_TRIANGLE,
+    expand,
+    commands,
+    segments,
+    polylines,
+)
+from koch_geometry import koch_curve_points, koch_snowflake_points
+from fractal_image import segment_chunks, write_segment_image
+
+
+def rewrite(lsystem, order):
+    # the string the streaming expansion must match, built the simple way
+    string = lsystem.axiom
+    for _ in range(order):
+        string = "".join(lsystem.rules.get(symbol, symbol) for symbol in string)
+    return string
+
+
+def test_expand():
+    for lsystem in [KOCH_SNOWFLAKE, SIERPINSKI_TRIANGLE]:
+        for order in range(5):
+            assert "".join(expand(lsystem, order)) == rewrite(lsystem, order)
+
+    # expansion is lazy, so the start of a huge expansion is available immediately
+    symbols = list(itertools.islice(expand(KOCH_SNOWFLAKE, 40), 8))
+    assert "".join(symbols) == "F+F--F+F"
+
+
+def test_commands():
+    assert list(commands(KOCH_CURVE, 1, 10.0)) == [
+        ("forward", 10.0),
+        ("left", 60),
+        ("forward", 10.0),
+        ("right", 60),
+        ("right", 60),
+        ("forward", 10.0),
+        ("left", 60),
+        ("forward", 10.0),
+    ]
+
+
+def test_segments():
+    for order in range(5):
+        step = KOCH_CURVE.step_size(300, order)
+        lines = list(segments(KOCH_CURVE, order, step))
+        assert len(lines) == 4**order
+        points = np.array([lines[0][:2]] + [line[2:] for line in lines])
+        assert np.allclose(points, koch_curve_points(order, (0, 0), (300, 0)))
+
+    step = KOCH_SNOWFLAKE.step_size(200, 3)
+    (points,) = polylines(KOCH_SNOWFLAKE, 3, step, start=(-100, 100))
+    assert np.allclose(points, koch_snowflake_points(3, 200, (-100, 100)))
+
+    # the Sierpinski outline is one connected path, with 3**(order+1) segments
+    step = SIERPINSKI_TRIANGLE.step_size(400, 4)
+    (points,) = polylines(SIERPINSKI_TRIANGLE, 4, step, start=(-200, -100))
+    assert len(points) == 3**5 + 1
+    assert np.allclose(points[0], points[-1])
+
+
+def test_branches():
+    # a branch returns the turtle to where it started, giving a separate polyline
+    tree = LSystem(axiom="F[+F]F", rules={}, angle=90)
+    lines = list(segments(tree, 0, 1.0))
+    assert np.allclose(lines, [(0, 0, 1, 0), (1, 0, 1, 1), (1, 0, 2, 0)])
+    assert [len(points) for points in polylines(tree, 0, 1.0)] == [3, 2]
+
+
+def test_write_segment_image(tmp_path):
+    step = KOCH_SNOWFLAKE.step_size(200, 3)
+    lines = list(segments(KOCH_SNOWFLAKE, 3, step, start=(-100, 100)))
+    # a single run of segments stays one subpath however it is chunked
+    svgs = []
+    for chunk_size in [len(lines), 7]:
+        path = str(tmp_path / f"koch_{chunk_size}.svg")
+        layers = [(segment_chunks(lines, chunk_size), "blue")]
+        write_segment_image(path, layers, 300, 300)
+        with open(path) as fp:
+            svgs.append(fp.read())
+    assert svgs[0] == svgs[1]
+    (data,) = re.findall(r' d="([^"]*)"', svgs[0])
+    assert data.count("M") == 1
+    assert len(re.findall(r"-?[0-9.]+,-?[0-9.]+", data)) == len(lines) + 1
+
+    # a branch starts a new subpath
+    tree = LSystem(axiom="F[+F]F", rules={}, angle=90)
+    path = str(tmp_path / "tree.svg")
+    layers = [(segment_chunks(segments(tree, 0, 10.0)), "red")]
+    write_segment_image(path, layers, 50, 50)
+    with open(path) as fp:
+        assert re.search(r' d="([^"]*)"', fp.read()).group(1).count("M") == 2
+
+    path = str(tmp_path / "koch.png")
+    write_segment_image(path, [(segment_chunks(lines, 7), "blue")], 300, 300)
+    with open(path, "rb") as fp:
+        assert fp.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+if __name__ == "__main__":
+    test_expand()
+    test_commands()
+    test_segments()
+    test_branches()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_write_segment_image(pathlib.Path(tmp_dir))
@@ -0,0 +1,68 @@
+import numpy as np
+
+from sierpinski import midpoint
+from sierpinski_raster import gasket_degrees, palette, render, ppm_header
+
+
+def painted_degrees(width, height, degree):
+    """Paint the triangles the way sierpinski() draws them, largest first, testing
+    each pixel centre against each triangle"""
+    px, py = np.meshgrid(np.arange(width) + 0.5, np.arange(height) + 0.5)
+    degrees = np.full((height, width), -1)
+
+    def paint(points, d):
+        (ax, ay), (bx, by), (cx, cy) = points
+        sides = [
+            (bx - ax) * (py - ay) - (by - ay) * (px - ax),
+            (cx - bx) * (py - by) - (cy - by) * (px - bx),
+            (ax - cx) * (py - cy) - (ay - cy) * (px - cx),
+        ]
+        inside = np.all([s >= 0 for s in sides], axis=0) | np.all(
+            [s <= 0 for s in sides], axis=0
+        )
+        degrees[inside] = d
+        if d > 0:
+            mid1 = midpoint(points[0], points[1])
+            mid2 = midpoint(points[1], points[2])
+            mid3 = midpoint(points[2], points[0])
+            paint([points[0], mid1, mid3], d - 1)
+            paint([points[1], mid1, mid2], d - 1)
+            paint([points[2], mid2, mid3], d - 1)
+
+    paint([[0, height], [width / 2, 0], [width, height]], degree)
+    return degrees
+
+
+def test_gasket_degrees():
+    width, height = 160, 120
+    for degree in range(6):
+        expected = painted_degrees(width, height, degree)
+        degrees = gasket_degrees((0, 0, width, height), width, height, degree)
+        # pixel centres exactly on an edge can go either way
+        assert np.mean(degrees != expected) < 0.01
+        # the same pixels from a tile part way into the image
+        tile = gasket_degrees((40, 30, 100, 70), width, height, degree)
+        assert np.array_equal(tile, degrees[30:70, 40:100])
+
+
+def test_render(tmp_path):
+    width, height, degree = 100, 70, 4
+    expected = palette()[gasket_degrees((0, 0, width, height), width, height, degree)]
+    for n_workers in [1, 2]:
+        path = str(tmp_path / f"gasket_{n_workers}.ppm")
+        render(path, width, height, degree, tile_size=32, n_workers=n_workers)
+        with open(path, "rb") as fp:
+            data = fp.read()
+        header = ppm_header(width, height)
+        assert data.startswith(header)
+        image = np.frombuffer(data[len(header) :], dtype=np.uint8)
+        assert np.array_equal(image.reshape(height, width, 3), expected)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    test_gasket_degrees()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_render(pathlib.Path(tmp_dir))
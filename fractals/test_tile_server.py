@@ -0,0 +1,132 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from fractal_image import COLOR_RGB, rasterize_polyline
+from koch_geometry import koch_snowflake_points
+from sierpinski_raster import gasket_degrees
+from tile_server import (
+    TileCache,
+    TileServer,
+    make_server,
+    render_koch_tile,
+    render_sierpinski_tile,
+    KOCH_SIZE,
+    KOCH_START,
+    KOCH_WORLD_SIZE,
+)
+
+
+def drawn(image):
+    return np.any(image != COLOR_RGB["white"], axis=2)
+
+
+def test_render_koch_tile():
+    # at zoom 0 the tile is the whole figure, as drawn from the full vertex array
+    order, size = 5, 300
+    tile = render_koch_tile(0, 0, 0, order, tile_size=size)
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[:, :] = COLOR_RGB["white"]
+    points = koch_snowflake_points(order, KOCH_SIZE, KOCH_START)
+    rasterize_polyline(image, points, "blue", scale=size / KOCH_WORLD_SIZE)
+    assert np.mean(drawn(tile) != drawn(image)) < 0.001
+
+    # the four zoom 1 tiles put together are the zoom 0 tile at twice the size
+    tiles = [
+        [drawn(render_koch_tile(1, x, y, order, tile_size=size)) for x in range(2)]
+        for y in range(2)
+    ]
+    whole = drawn(render_koch_tile(0, 0, 0, order, tile_size=2 * size))
+    assert np.mean(np.block(tiles) != whole) < 0.001
+
+    # a deep zoom tile on the curve has some of it, a tile in the middle has none
+    x = 2**20 // 3
+    assert drawn(render_koch_tile(20, x, x, 40)).any()
+    assert not drawn(render_koch_tile(20, 2**19, 2**19, 40)).any()
+
+
+def test_render_sierpinski_tile():
+    size = 64
+    whole = gasket_degrees((0, 0, 2 * size, 2 * size), 2 * size, 2 * size, 6)
+    tile = render_sierpinski_tile(1, 1, 1, 6, tile_size=size)
+    tile_degrees = whole[size:, size:]
+    blue = np.all(tile == COLOR_RGB["blue"], axis=2)
+    assert np.array_equal(blue, tile_degrees == 0)
+
+
+def test_tile_cache(tmp_path):
+    cache = TileCache(max_tiles=2)
+    cache.put(("koch", 0, 0, 0), b"a")
+    cache.put(("koch", 1, 0, 0), b"b")
+    assert cache.get(("koch", 0, 0, 0)) == b"a"
+    # the least recently used tile is evicted
+    cache.put(("koch", 1, 1, 0), b"c")
+    assert cache.get(("koch", 1, 0, 0)) is None
+    assert cache.get(("koch", 0, 0, 0)) == b"a"
+    assert len(cache) == 2
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"]) == (2, 1)
+
+    disk_cache = TileCache(max_tiles=1, cache_dir=str(tmp_path))
+    disk_cache.put(("koch", 0, 0, 0), b"a")
+    disk_cache.put(("koch", 1, 0, 0), b"b")
+    assert disk_cache.get(("koch", 0, 0, 0)) == b"a"
+    assert disk_cache.stats()["disk_hits"] == 1
+    # the disk tier survives a new cache
+    assert TileCache(cache_dir=str(tmp_path)).get(("koch", 1, 0, 0)) == b"b"
+
+    # tiles on disk are only reused by a server with the same render parameters
+    server_cache_dir = str(tmp_path / "server")
+    first = TileServer(koch_order=3, cache=TileCache(cache_dir=server_cache_dir))
+    data = first.get_tile("koch", 0, 0, 0)
+    same = TileServer(koch_order=3, cache=TileCache(cache_dir=server_cache_dir))
+    assert same.get_tile("koch", 0, 0, 0) == data
+    assert same.renders == 0
+    other = TileServer(koch_order=4, cache=TileCache(cache_dir=server_cache_dir))
+    assert other.get_tile("koch", 0, 0, 0) != data
+    assert other.renders == 1
+
+
+def test_server():
+    tile_server = TileServer(koch_order=6, sierpinski_degree=8)
+    server = make_server(tile_server, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://localhost:{server.server_address[1]}"
+    try:
+        for _ in range(2):
+            with urllib.request.urlopen(f"{url}/tiles/koch/1/0/0.png") as response:
+                assert response.headers["Content-Type"] == "image/png"
+                assert response.read().startswith(b"\x89PNG")
+        with urllib.request.urlopen(f"{url}/tiles/sierpinski/0/0/0.png") as response:
+            assert response.read().startswith(b"\x89PNG")
+        for path in ["/tiles/koch/1/2/0.png", "/tiles/mandelbrot/0/0/0.png"]:
+            try:
+                urllib.request.urlopen(url + path)
+                assert False, path
+            except urllib.error.HTTPError as e:
+                assert e.code == 404
+        with urllib.request.urlopen(f"{url}/") as response:
+            assert b"leaflet" in response.read()
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            metrics = json.load(response)
+        assert metrics["renders"] == 2
+        assert metrics["memory_hits"] == 1
+        assert metrics["hit_rate"] == 1 / 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    test_render_koch_tile()
+    test_render_sierpinski_tile()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_tile_cache(pathlib.Path(tmp_dir))
+    test_server()
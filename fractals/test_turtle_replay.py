@@ -0,0 +1,100 @@
+import numpy as np
+
+from koch_geometry import koch_snowflake_points
+from sierpinski import COLORMAP
+from sierpinski_raster import gasket_degrees
+from turtle_replay import (
+    TurtleReplay,
+    koch_snowflake_shapes,
+    sierpinski_shapes,
+    visible_order,
+)
+
+
+class RecordingTurtle:
+    """Records the calls TurtleReplay makes, in place of a turtle and its screen"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args):
+            self.calls.append((name,) + args)
+
+        return record
+
+
+def paint(shapes, width, height):
+    """Fill the shapes in order, returning the colour name at each pixel centre"""
+    px, py = np.meshgrid(np.arange(width) + 0.5, np.arange(height) + 0.5)
+    colors = np.full((height, width), "", dtype=object)
+    for points, color in shapes:
+        (ax, ay), (bx, by), (cx, cy) = points
+        sides = [
+            (bx - ax) * (py - ay) - (by - ay) * (px - ax),
+            (cx - bx) * (py - by) - (cy - by) * (px - bx),
+            (ax - cx) * (py - cy) - (ay - cy) * (px - cx),
+        ]
+        inside = np.all([s >= 0 for s in sides], axis=0) | np.all(
+            [s <= 0 for s in sides], axis=0
+        )
+        colors[inside] = color
+    return colors
+
+
+def test_visible_order():
+    assert visible_order(10, 200, 3) == 5
+    assert visible_order(3, 200, 3) == 3
+    assert visible_order(10, 0.5, 3) == 0
+
+
+def test_koch_snowflake_shapes():
+    shapes = koch_snowflake_shapes(8, 200, (-100, 100), ["red", "blue"])
+    assert [color for _, color in shapes] == ["red", "blue"] * 4
+    assert np.array_equal(shapes[2][0], koch_snowflake_points(2, 200, (-100, 100)))
+    # orders past the pixel size are not subdivided any further
+    assert len(shapes[7][0]) == len(shapes[5][0])
+
+
+def test_sierpinski_shapes():
+    width, height, degree = 128, 96, 4
+    # the triangle filling the image, as placed by sierpinski_raster
+    triangle = [[0, height], [width / 2, 0], [width, height]]
+    shapes = sierpinski_shapes(triangle, degree, COLORMAP, pixel=0)
+    # the outer triangle and (3**degree - 1) / 2 holes, instead of every triangle
+    assert len(shapes) == 1 + (3**degree - 1) // 2
+    colors = paint(shapes, width, height)
+    degrees = gasket_degrees((0, 0, width, height), width, height, degree)
+    expected = np.array([""] + COLORMAP, dtype=object)[degrees + 1]
+    assert np.mean(colors != expected) < 0.01
+
+    # holes below a pixel are skipped
+    assert len(sierpinski_shapes(triangle, 12, COLORMAP)) < len(shapes) * 30
+
+
+def test_turtle_replay():
+    t = RecordingTurtle()
+    screen = RecordingTurtle()
+    replay = TurtleReplay(t, screen, batch=10)
+    shapes = koch_snowflake_shapes(3, 200, (-100, 100), ["red"])
+    replay.paths(shapes)
+    assert screen.calls[0] == ("tracer", 0, 0)
+    n_lines = sum(len(points) - 1 for points, _ in shapes)
+    assert replay.primitives == n_lines
+    assert len([c for c in t.calls if c[0] == "goto"]) == n_lines + len(shapes)
+    # one update per batch and one at the end
+    assert replay.updates == n_lines // 10 + 1
+    assert screen.calls.count(("update",)) == replay.updates
+
+    replay = TurtleReplay(RecordingTurtle(), RecordingTurtle(), batch=None)
+    triangle = [[-200, -100], [0, 200], [200, -100]]
+    replay.polygons(sierpinski_shapes(triangle, 3, COLORMAP))
+    assert replay.primitives == 1 + 13
+    assert replay.updates == 1
+
+
+if __name__ == "__main__":
+    test_visible_order()
+    test_koch_snowflake_shapes()
+    test_sierpinski_shapes()
+    test_turtle_replay()
@@ -0,0 +1,321 @@
+"""Zoomable tile pyramid for the Koch snowflake and the Sierpinski gasket, rendered on
+demand and served over HTTP with a Leaflet map viewer.
+
+Tiles are addressed like web map tiles: at zoom z the figure is split into 2**z by 2**z
+tiles of TILE_SIZE pixels, x from the left and y from the top.  Each tile only renders
+the geometry inside it, down to pixel size, so deep zoom tiles cost about as much as
+shallow ones.  Rendered tiles are kept in an in-memory LRU cache, optionally backed by
+PNG files on disk.  /metrics reports cache hit rates and render latency.
+
+    python tile_server.py --port 8000 --cache_dir tile_cache
+"""
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from fractal_image import COLOR_RGB, encode_png, rasterize_segments
+from koch_geometry import bounding_boxes, koch_snowflake_points, subdivide_segments
+from sierpinski_raster import degrees_to_rgb, gasket_degrees
+
+TILE_SIZE = 256
+# beyond this the pixel coordinates run out of floating point precision
+MAX_ZOOM = 36
+# the Koch snowflake is placed in the turtle window as in turtle_fractals.py
+KOCH_WORLD_SIZE = 600.0
+KOCH_SIZE = 200.0
+KOCH_START = (-100.0, 100.0)
+KOCH_COLOR = "blue"
+
+# (layer, zoom, x, y), where the layer names the fractal and its render parameters, e.g.
+# koch_o12_256, so a cache directory never serves tiles rendered with other settings
+TileKey = Tuple[str, int, int, int]
+
+
+def render_koch_tile(
+    zoom: int, x: int, y: int, order: int, tile_size: int = TILE_SIZE
+) -> np.ndarray:
+    """Render one tile of the Koch snowflake of the given order.  Segments whose curve
+    cannot reach the tile are dropped before each subdivision, and segments shorter than
+    a pixel are drawn as they are rather than subdivided further."""
+    tile_world = KOCH_WORLD_SIZE / 2**zoom
+    pixel = tile_world / tile_size
+    x_min = -KOCH_WORLD_SIZE / 2 + x * tile_world
+    y_max = KOCH_WORLD_SIZE / 2 - y * tile_world
+    # cull against the tile grown by a pixel so lines on the border are kept
+    box = (
+        x_min - pixel,
+        y_max - tile_world - pixel,
+        x_min + tile_world + pixel,
+        y_max + pixel,
+    )
+
+    corners = koch_snowflake_points(0, KOCH_SIZE, KOCH_START)
+    starts, ends = corners[:-1], corners[1:]
+    done = []
+    for remaining in range(order, -1, -1):
+        bounds = bounding_boxes(starts, ends)
+        visible = (
+            (bounds[:, 0] <= box[2])
+            & (bounds[:, 2] >= box[0])
+            & (bounds[:, 1] <= box[3])
+            & (bounds[:, 3] >= box[1])
+        )
+        starts, ends = starts[visible], ends[visible]
+        final = np.hypot(*(ends - starts).T) <= pixel
+        if remaining == 0:
+            final[:] = True
+        done.append((starts[final], ends[final]))
+        starts, ends = starts[~final], ends[~final]
+        if len(starts) == 0:
+            break
+        starts, ends = subdivide_segments(starts, ends)
+
+    image = np.empty((tile_size, tile_size, 3), dtype=np.uint8)
+    image[:, :] = COLOR_RGB["white"]
+    starts = np.concatenate([s for s, _ in done])
+    ends = np.concatenate([e for _, e in done])
+    rasterize_segments(
+        image,
+        (starts[:, 0] - x_min) / pixel,
+        (y_max - starts[:, 1]) / pixel,
+        (ends[:, 0] - x_min) / pixel,
+        (y_max - ends[:, 1]) / pixel,
+        KOCH_COLOR,
+    )
+    return image
+
+
+def render_sierpinski_tile(
+    zoom: int, x: int, y: int, degree: int, tile_size: int = TILE_SIZE
+) -> np.ndarray:
+    """Render one tile of the Sierpinski gasket, which fills the zoom 0 tile"""
+    size = tile_size * 2**zoom
+    box = (x * tile_size, y * tile_size, (x + 1) * tile_size, (y + 1) * tile_size)
+    return degrees_to_rgb(gasket_degrees(box, size, size, degree))
+
+
+class TileCache:
+    """Bounded LRU cache of encoded tiles, with an optional directory of PNG files
+    behind it that is not bounded"""
+
+    def __init__(self, max_tiles: int = 1024, cache_dir: Optional[str] = None):
+        self.max_tiles = max_tiles
+        self.cache_dir = cache_dir
+        self._tiles: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: TileKey) -> str:
+        layer, zoom, x, y = key
+        return os.path.join(self.cache_dir, layer, str(zoom), str(x), f"{y}.png")
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        with self._lock:
+            data = self._tiles.get(key)
+            if data is not None:
+                self._tiles.move_to_end(key)
+                self.memory_hits += 1
+                return data
+        if self.cache_dir is not None and os.path.exists(self._path(key)):
+            with open(self._path(key), "rb") as fp:
+                data = fp.read()
+            self._put_memory(key, data)
+            with self._lock:
+                self.disk_hits += 1
+            return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: TileKey, data: bytes):
+        self._put_memory(key, data)
+        if self.cache_dir is not None:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write then rename, so other threads never read a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+
+    def _put_memory(self, key: TileKey, data: bytes):
+        with self._lock:
+            self._tiles[key] = data
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def stats(self) -> Dict:
+        requests = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "tiles_in_memory": len(self._tiles),
+            "max_tiles": self.max_tiles,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / requests
+            if requests
+            else 0.0,
+        }
+
+
+class TileServer:
+    """Renders and caches tiles, keeping render latency statistics"""
+
+    def __init__(
+        self,
+        koch_order: int = 12,
+        sierpinski_degree: int = 30,
+        tile_size: int = TILE_SIZE,
+        cache: Optional[TileCache] = None,
+    ):
+        self.tile_size = tile_size
+        self.renderers = {
+            "koch": lambda z, x, y: render_koch_tile(z, x, y, koch_order, tile_size),
+            "sierpinski": lambda z, x, y: render_sierpinski_tile(
+                z, x, y, sierpinski_degree, tile_size
+            ),
+        }
+        self.layers = {
+            "koch": f"koch_o{koch_order}_{tile_size}",
+            "sierpinski": f"sierpinski_d{sierpinski_degree}_{tile_size}",
+        }
+        self.cache = cache if cache is not None else TileCache()
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.max_render_seconds = 0.0
+
+    def get_tile(self, fractal: str, zoom: int, x: int, y: int) -> bytes:
+        """Return the tile as PNG data, raising KeyError for an unknown fractal and
+        ValueError for a tile outside the pyramid"""
+        renderer = self.renderers[fractal]
+        if not (0 <= zoom <= MAX_ZOOM and 0 <= x < 2**zoom and 0 <= y < 2**zoom):
+            raise ValueError(f"No tile {zoom}/{x}/{y}")
+        key = (self.layers[fractal], zoom, x, y)
+        data = self.cache.get(key)
+        if data is None:
+            start = time.perf_counter()
+            data = encode_png(renderer(zoom, x, y))
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.renders += 1
+                self.render_seconds += seconds
+                self.max_render_seconds = max(self.max_render_seconds, seconds)
+            self.cache.put(key, data)
+        return data
+
+    def metrics(self) -> Dict:
+        metrics = self.cache.stats()
+        metrics["renders"] = self.renders
+        metrics["mean_render_seconds"] = (
+            self.render_seconds / self.renders if self.renders else 0.0
+        )
+        metrics["max_render_seconds"] = self.max_render_seconds
+        return metrics
+
+
+VIEWER_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<title>Fractal tiles</title>
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<style>html, body, #map {{ height: 100%; margin: 0; }}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var options = {{tileSize: {tile_size}, noWrap: true, maxZoom: {max_zoom}}};
+var layers = {{
+  "Koch snowflake": L.tileLayer("/tiles/koch/{{z}}/{{x}}/{{y}}.png", options),
+  "Sierpinski gasket": L.tileLayer("/tiles/sierpinski/{{z}}/{{x}}/{{y}}.png", options)
+}};
+var map = L.map("map", {{crs: L.CRS.Simple, layers: [layers["Koch snowflake"]]}});
+map.setView(map.unproject([{tile_size} / 2, {tile_size} / 2], 0), 1);
+L.control.layers(layers).addTo(map);
+</script>
+</body>
+</html>
+"""
+
+
+def make_handler(tile_server: TileServer):
+    class TileHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if self.path == "/":
+                html = VIEWER_HTML.format(
+                    tile_size=tile_server.tile_size, max_zoom=MAX_ZOOM
+                )
+                self._send(200, "text/html", html.encode("utf-8"))
+            elif self.path == "/metrics":
+                body = json.dumps(tile_server.metrics(), indent=2)
+                self._send(200, "application/json", body.encode("utf-8"))
+            elif len(parts) == 5 and parts[0] == "tiles" and parts[4].endswith(".png"):
+                try:
+                    zoom, x, y = int(parts[2]), int(parts[3]), int(parts[4][:-4])
+                    data = tile_server.get_tile(parts[1], zoom, x, y)
+                except (KeyError, ValueError):
+                    self._send(404, "text/plain", b"No such tile")
+                    return
+                self._send(200, "image/png", data)
+            else:
+                self._send(404, "text/plain", b"Not found")
+
+        def _send(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # one line per request is too noisy when panning
+            pass
+
+    return TileHandler
+
+
+def make_server(
+    tile_server: TileServer, host: str = "localhost", port: int = 8000
+) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(tile_server))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default=8000, type=int)
+    parser.add_argument("--koch_order", default=12, type=int)
+    parser.add_argument("--sierpinski_degree", default=30, type=int)
+    parser.add_argument("--max_tiles", default=1024, type=int)
+    parser.add_argument(
+        "--cache_dir", default=None, help="also keep rendered tiles in this directory"
+    )
+    args = parser.parse_args()
+
+    tile_server = TileServer(
+        koch_order=args.koch_order,
+        sierpinski_degree=args.sierpinski_degree,
+        cache=TileCache(max_tiles=args.max_tiles, cache_dir=args.cache_dir),
+    )
+    server = make_server(tile_server, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
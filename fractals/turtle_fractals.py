@@ -1,57 +1,91 @@
 import argparse
-import turtle
+
+from lsystem import KOCH_CURVE, KOCH_SNOWFLAKE, commands, draw_turtle
 
 
 def koch_curve(t, order, size):
-    if order == 0:
-        t.forward(size)
-    else:
-        size /= 3.0
-        koch_curve(t, order - 1, size)
-        t.left(60)
-        koch_curve(t, order - 1, size)
-        t.right(120)
-        koch_curve(t, order - 1, size)
-        t.left(60)
-        koch_curve(t, order - 1, size)
+    draw_turtle(t, commands(KOCH_CURVE, order, KOCH_CURVE.step_size(size, order)))
 
 
 def koch_snowflake(t, order, size):
-    for _ in range(3):
-        koch_curve(t, order, size)
-        t.right(120)
+    draw_turtle(
+        t, commands(KOCH_SNOWFLAKE, order, KOCH_SNOWFLAKE.step_size(size, order))
+    )
 
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--order", default=3, type=int)
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="write an .svg or .png file instead of drawing with turtle",
+    )
+    parser.add_argument(
+        "--image_size", default=600, type=int, help="width and height of --output"
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="precompute the snowflakes and draw them with screen updates batched",
+    )
+    parser.add_argument(
+        "--batch",
+        default=500,
+        type=int,
+        help="with --fast, update the screen after this many lines (0: only at the end)",
+    )
     args = parser.parse_args()
 
-    # Set up the turtle
-    t = turtle.Turtle()
-    t.speed(0)  # Fastest speed
-    window = turtle.Screen()
-    window.bgcolor("white")
+    colors = ["red", "blue", "green", "orange", "purple", "yellow", "cyan", "magenta"]
+    window_size = 600
+    size = 200
+    # Move to a more centered starting position
+    start = (-window_size / 2 + size, window_size / 2 - size)
 
-    # Set window size
-    window.setup(width=600, height=600)
+    if args.output is not None:
+        from koch_geometry import koch_snowflake_points
+        from fractal_image import write_image
 
-    # Adjust turtle position to center the fractal
-    start = (-window.window_width() / 2, window.window_height() / 2)
-    size = 200
-    t.penup()
-    t.goto(
-        start[0] + size, start[1] - size
-    )  # Move to a more centered starting position
-    t.pendown()
+        layers = [
+            (koch_snowflake_points(order, size, start), colors[order % len(colors)])
+            for order in range(args.order)
+        ]
+        write_image(
+            args.output,
+            layers,
+            args.image_size,
+            args.image_size,
+            scale=args.image_size / window_size,
+        )
+    else:
+        import turtle
 
-    colors = ["red", "blue", "green", "orange", "purple", "yellow", "cyan", "magenta"]
-    # Draw a Koch snowflake of order 3 and size 300
-    for order in range(args.order):
-        color = colors[order % len(colors)]
-        t.color(color)
-        koch_snowflake(t, order, size)
-
-    # Close window on click
-    window.exitonclick()
+        # Set up the turtle
+        t = turtle.Turtle()
+        t.speed(0)  # Fastest speed
+        window = turtle.Screen()
+        window.bgcolor("white")
+
+        # Set window size
+        window.setup(width=window_size, height=window_size)
+
+        if args.fast:
+            from turtle_replay import TurtleReplay, koch_snowflake_shapes
+
+            replay = TurtleReplay(t, window, batch=args.batch)
+            replay.paths(koch_snowflake_shapes(args.order, size, start, colors))
+        else:
+            t.penup()
+            t.goto(*start)
+            t.pendown()
+
+            # Draw one Koch snowflake per order, each in its own colour
+            for order in range(args.order):
+                color = colors[order % len(colors)]
+                t.color(color)
+                koch_snowflake(t, order, size)
+
+        # Close window on click
+        window.exitonclick()
@@ -0,0 +1,133 @@
+"""Fast turtle drawing: precompute the geometry that will actually be visible, then
+replay it with screen tracing off, updating the screen once every batch of primitives
+rather than after every move."""
+from typing import Iterable, List, Optional, Sequence, Tuple
+import math
+
+import numpy as np
+
+from koch_geometry import koch_snowflake_points
+
+# polyline or polygon vertices and a colour
+Shape = Tuple[np.ndarray, str]
+
+DEFAULT_BATCH = 500
+
+
+def visible_order(
+    order: int, size: float, scale_per_order: float, pixel: float = 1.0
+) -> int:
+    """Orders beyond the one where steps shrink below a pixel look just the same, so
+    return the lower of order and that one"""
+    if size <= pixel:
+        return 0
+    return min(order, int(math.log(size / pixel, scale_per_order)) + 1)
+
+
+def koch_snowflake_shapes(
+    order: int,
+    size: float,
+    start: Tuple[float, float],
+    colors: Sequence[str],
+    pixel: float = 1.0,
+) -> List[Shape]:
+    """One snowflake per order below order, each in its own colour, as drawn by the
+    turtle_fractals.py main loop, computed once up front"""
+    return [
+        (
+            koch_snowflake_points(visible_order(o, size, 3, pixel), size, start),
+            colors[o % len(colors)],
+        )
+        for o in range(order)
+    ]
+
+
+def sierpinski_shapes(
+    points: Sequence[Sequence[float]],
+    degree: int,
+    colormap: Sequence[str],
+    pixel: float = 1.0,
+) -> List[Shape]:
+    """Filled triangles giving the same picture as sierpinski(), without overdraw.
+
+    sierpinski() paints each triangle and then its three corner triangles over it, so
+    all that stays visible of a triangle of degree d is its middle hole, in colour d,
+    and the degree 0 triangles.  So the outer triangle is filled in the degree 0 colour
+    and the holes are drawn on top; holes never overlap.  Holes smaller than a pixel are
+    skipped.  Colours cycle through colormap for degrees beyond its length.
+    """
+    shapes: List[Shape] = [(np.array(points, dtype=np.float64), colormap[0])]
+    stack = [(np.array(points, dtype=np.float64), degree)]
+    while stack:
+        triangle, d = stack.pop()
+        if d == 0:
+            continue
+        mid1 = (triangle[0] + triangle[1]) / 2
+        mid2 = (triangle[1] + triangle[2]) / 2
+        mid3 = (triangle[2] + triangle[0]) / 2
+        hole = np.array([mid1, mid2, mid3])
+        if np.ptp(hole, axis=0).max() < pixel:
+            continue
+        shapes.append((hole, colormap[d % len(colormap)]))
+        stack.append((np.array([triangle[0], mid1, mid3]), d - 1))
+        stack.append((np.array([triangle[1], mid1, mid2]), d - 1))
+        stack.append((np.array([triangle[2], mid2, mid3]), d - 1))
+    return shapes
+
+
+class TurtleReplay:
+    """Draws precomputed shapes with screen tracing off.  The screen is updated after
+    every batch primitives (moves and fills), or only at the end if batch is None."""
+
+    def __init__(self, t, screen, batch: Optional[int] = DEFAULT_BATCH):
+        self.t = t
+        self.screen = screen
+        self.batch = batch
+        self.primitives = 0
+        self.updates = 0
+        screen.tracer(0, 0)
+        t.hideturtle()
+
+    def _drew(self, n: int = 1):
+        before = self.primitives
+        self.primitives += n
+        if self.batch and self.primitives // self.batch > before // self.batch:
+            self.update()
+
+    def update(self):
+        self.screen.update()
+        self.updates += 1
+
+    def _jump(self, x: float, y: float):
+        self.t.penup()
+        self.t.goto(x, y)
+        self.t.pendown()
+
+    def path(self, points: np.ndarray, color: str):
+        self.t.color(color)
+        self._jump(*points[0])
+        goto = self.t.goto
+        for x, y in points[1:].tolist():
+            goto(x, y)
+            self._drew()
+
+    def polygon(self, points: np.ndarray, color: str):
+        self.t.fillcolor(color)
+        self.t.pencolor(color)
+        self._jump(*points[0])
+        self.t.begin_fill()
+        for x, y in points[1:].tolist():
+            self.t.goto(x, y)
+        self.t.goto(*points[0])
+        self.t.end_fill()
+        self._drew()
+
+    def paths(self, shapes: Iterable[Shape]):
+        for points, color in shapes:
+            self.path(points, color)
+        self.update()
+
+    def polygons(self, shapes: Iterable[Shape]):
+        for points, color in shapes:
+            self.polygon(points, color)
+        self.update()
@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from puzzle_generator import generate_puzzle
+from parallel_solver import run_parallel_check
+from solvers import SOLVERS
+from search_instrumentation import SearchInstrumentation
+
+# more symbols than puzzle_generator's default, so larger puzzles have few solutions
+BENCHMARK_SYMBOLS = "ABCDEFGH"
+
+
+def run_benchmark(
+    dx: int,
+    dy: int,
+    seed: int,
+    symbols: str = BENCHMARK_SYMBOLS,
+    max_states: Optional[int] = None,
+    break_symmetry: bool = False,
+    n_workers: int = 1,
+    strategy: str = "raster",
+    stats_json: Optional[str] = None,
+) -> Dict:
+    """Generate a puzzle, solve it, and return a dict of timing / search statistics"""
+    tiles, _ = generate_puzzle(dx, dy, symbols=symbols, seed=seed)
+    gs = SOLVERS[strategy](
+        dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry
+    )
+    instrumentation = None
+    if stats_json and n_workers > 1:
+        raise ValueError("Search instrumentation needs n_workers=1")
+    if stats_json:
+        instrumentation = SearchInstrumentation().attach(gs)
+    start = time.perf_counter()
+    first_solution_seconds = None
+    if n_workers > 1:
+        run_parallel_check(
+            gs, n_workers=n_workers, max_states=max_states, count_only=True
+        )
+    else:
+        for _ in gs.iter_solutions(max_states=max_states):
+            if first_solution_seconds is None:
+                first_solution_seconds = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    if instrumentation is not None:
+        instrumentation.to_json(stats_json)
+    return {
+        "name": f"{dx}x{dy}_seed{seed}",
+        "strategy": strategy,
+        "dx": dx,
+        "dy": dy,
+        "seed": seed,
+        "symbols": symbols,
+        "break_symmetry": break_symmetry,
+        "workers": n_workers,
+        "seconds": elapsed,
+        "first_solution_seconds": first_solution_seconds,
+        "states_checked": gs._states_checked,
+        "solutions_found": gs._solutions_found,
+        "states_per_second": gs._states_checked / elapsed if elapsed > 0 else 0.0,
+        "complete": gs._search_complete,
+    }
+
+
+def check_result(result: Dict) -> List[str]:
+    """Correctness checks that don't need a baseline"""
+    errors = []
+    # generated puzzles always have at least one solution
+    if result["complete"] and result["solutions_found"] == 0:
+        errors.append(f"{result['name']}: no solution found for solvable puzzle")
+    return errors
+
+
+def compare_to_baseline(
+    results: List[Dict], baseline: List[Dict], threshold: float
+) -> List[str]:
+    """Compare results to a baseline run.  The search is deterministic, so solution
+    counts must match exactly; time may regress by at most 'threshold'."""
+    errors = []
+    def _key(result: Dict):
+        return (
+            result["name"],
+            result.get("strategy", "raster"),
+            result["symbols"],
+            result.get("break_symmetry", False),
+            result.get("workers", 1),
+        )
+
+    baseline_by_name = {_key(b): b for b in baseline}
+    for result in results:
+        key = _key(result)
+        if key not in baseline_by_name:
+            print(f"{result['name']}: no baseline, skipping comparison")
+            continue
+        base = baseline_by_name[key]
+        if base["complete"] and not result["complete"]:
+            errors.append(f"{result['name']}: search no longer completes")
+            continue
+        if not (result["complete"] and base["complete"]):
+            # can only compare partial searches by speed
+            base_rate = base["states_per_second"]
+            if result["states_per_second"] < base_rate / (1 + threshold):
+                errors.append(
+                    f"{result['name']}: checked {result['states_per_second']:.0f} "
+                    f"states/s, baseline checked {base_rate:.0f} states/s"
+                )
+            continue
+        if result["solutions_found"] != base["solutions_found"]:
+            errors.append(
+                f"{result['name']}: found {result['solutions_found']} solutions, "
+                f"baseline found {base['solutions_found']}"
+            )
+        if result["seconds"] > base["seconds"] * (1 + threshold):
+            errors.append(
+                f"{result['name']}: took {result['seconds']:.3f}s, "
+                f"baseline took {base['seconds']:.3f}s"
+            )
+    return errors
+
+
+def print_results(results: List[Dict]):
+    print(
+        f"{'puzzle':>14s} {'strategy':>16s} {'seconds':>10s} {'states':>12s} {'states/s':>12s} "
+        f"{'solutions':>10s} {'complete':>9s}"
+    )
+    for result in results:
+        print(
+            f"{result['name']:>14s} {result['strategy']:>16s} "
+            f"{result['seconds']:10.3f} "
+            f"{result['states_checked']:12d} {result['states_per_second']:12.0f} "
+            f"{result['solutions_found']:10d} {str(result['complete']):>9s}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[3, 4, 5, 6])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--symbols", default=BENCHMARK_SYMBOLS)
+    parser.add_argument(
+        "--max_states",
+        type=int,
+        default=20_000_000,
+        help="abandon the search of a single puzzle after this many states",
+    )
+    parser.add_argument(
+        "--break_symmetry",
+        action="store_true",
+        help="only search for one solution per rotational symmetry class",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--strategies", nargs="+", default=["raster"], choices=list(SOLVERS)
+    )
+    parser.add_argument(
+        "--stats_dir",
+        help="write search instrumentation for each run to JSON files in this "
+        "directory (this slows the search down, needs --workers 1)",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed fractional slowdown relative to the baseline",
+    )
+    args = parser.parse_args()
+    if args.stats_dir and args.workers > 1:
+        # each worker searches with its own GridState, which isn't instrumented
+        parser.error("--stats_dir needs --workers 1")
+
+    results = []
+    for size in args.sizes:
+        for seed in args.seeds:
+            for strategy in args.strategies:
+                result = run_benchmark(
+                    size,
+                    size,
+                    seed,
+                    symbols=args.symbols,
+                    max_states=args.max_states,
+                    break_symmetry=args.break_symmetry,
+                    n_workers=args.workers,
+                    strategy=strategy,
+                    stats_json=(
+                        os.path.join(
+                            args.stats_dir, f"{size}x{size}_seed{seed}_{strategy}.json"
+                        )
+                        if args.stats_dir
+                        else None
+                    ),
+                )
+                results.append(result)
+                print(
+                    f"{result['name']} {strategy}: {result['seconds']:.3f}s", flush=True
+                )
+
+    errors = []
+    for result in results:
+        errors += check_result(result)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            errors += compare_to_baseline(results, json.load(fp), args.threshold)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+
+    print()
+    print_results(results)
+    for error in errors:
+        print(f"FAILED: {error}")
+    sys.exit(1 if errors else 0)
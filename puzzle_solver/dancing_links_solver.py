@@ -0,0 +1,285 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from puzzle_solver import GridState, TileState, Tile, STOP_CHECK_INTERVAL
+
+
+class DancingLinksGridState(GridState):
+    """GridState that solves the puzzle as an exact cover problem, using Knuth's
+    dancing links.
+
+    Each row of the matrix places one (tile, rotation) option in one cell.  The primary
+    columns are the cells and the tiles, each of which must be covered exactly once.
+    Each interior edge between two cells is a secondary column, which may be covered
+    by several rows as long as they agree on its colour (Knuth's Algorithm C, exact
+    cover with colours).  A row on the first (west or north) side of an edge gives it
+    the colour of its edge label, and a row on the second side gives it the colour of
+    the label its own edge is compatible with, so only compatible neighbours agree.
+    """
+
+    def __init__(
+        self,
+        dx: int,
+        dy: int,
+        tiles: List[Tile],
+        break_symmetry: bool = False,
+    ):
+        super().__init__(dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry)
+        labels = sorted(set(edge for tile in self.tiles for edge in tile))
+        # colours are numbered from 1; 0 means a node has no colour
+        self._first_color = {label: idx + 1 for idx, label in enumerate(labels)}
+        self._second_color = {}
+        for label in labels:
+            partners = [other for other in labels if self._compatible(other, label)]
+            if len(partners) > 1:
+                raise ValueError(f"Edge {label} is compatible with several edges")
+            if partners:
+                self._second_color[label] = self._first_color[partners[0]]
+            else:
+                # matches nothing
+                self._second_color[label] = len(labels) + 1
+        # (first cell, first cell edge, second cell, second cell edge) for each
+        # interior edge
+        self._interior_edges = []
+        for gidx in range(self._n_tiles):
+            if gidx % self.dx < self.dx - 1:
+                self._interior_edges.append((gidx, "E", gidx + 1, "W"))
+            if gidx // self.dx < self.dy - 1:
+                self._interior_edges.append((gidx, "S", gidx + self.dx, "N"))
+        # set if the search was stopped early by max_states or should_stop
+        self._stopped = False
+        # built on the first search and copied for each one, see _search
+        self._matrix = None
+
+    def _build_matrix(self):
+        """Build the dancing links structure for every placement.  Nodes are indices
+        into the L, R, U, D (neighbour), C (column) and color lists; node 0 is the root
+        and nodes 1.. are the column headers, with the primary columns linked into the
+        root list and the secondary columns linked only to themselves.  Also returns
+        the first node of the row for each (cell, option), which is in the cell's
+        column."""
+        n = self._n_tiles
+        n_primary = 2 * n
+        n_columns = n_primary + len(self._interior_edges)
+
+        L = list(range(-1, n_columns))
+        R = list(range(1, n_columns + 2))
+        L[0] = n_primary
+        R[n_primary] = 0
+        for col in range(n_primary + 1, n_columns + 1):
+            L[col] = col
+            R[col] = col
+        U = list(range(n_columns + 1))
+        D = list(range(n_columns + 1))
+        C = list(range(n_columns + 1))
+        S = [0] * (n_columns + 1)
+        color = [0] * (n_columns + 1)
+        # the (cell, option) placed by the row each node belongs to
+        row_of: List[Tuple[int, int]] = [(-1, -1)] * (n_columns + 1)
+        row_start: Dict[Tuple[int, int], int] = {}
+
+        def _add_row(gidx: int, option: int, columns: List[Tuple[int, int]]):
+            first = len(C)
+            row_start[(gidx, option)] = first
+            for idx, (col, col_color) in enumerate(columns):
+                node = first + idx
+                L.append(node - 1 if idx > 0 else first + len(columns) - 1)
+                R.append(node + 1 if idx < len(columns) - 1 else first)
+                U.append(U[col])
+                D.append(col)
+                D[U[col]] = node
+                U[col] = node
+                C.append(col)
+                S[col] += 1
+                color.append(col_color)
+                row_of.append((gidx, option))
+
+        for gidx in range(n):
+            for tidx in range(n):
+                for ridx in range(self._max_ridx[tidx] + 1):
+                    state = TileState(tidx=tidx, ridx=ridx)
+                    # column numbers are 1 based, after the root
+                    columns = [(1 + gidx, 0), (1 + n + tidx, 0)]
+                    for eidx, (first, first_edge, second, second_edge) in enumerate(
+                        self._interior_edges
+                    ):
+                        col = 1 + n_primary + eidx
+                        if gidx == first:
+                            label = self._edge_lookup(state, first_edge)
+                            columns.append((col, self._first_color[label]))
+                        elif gidx == second:
+                            label = self._edge_lookup(state, second_edge)
+                            columns.append((col, self._second_color[label]))
+                    _add_row(gidx, 4 * tidx + ridx, columns)
+        return L, R, U, D, C, S, color, row_of, row_start
+
+    def _search(
+        self,
+        max_states: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[List[TileState]]:
+        if self._matrix is None:
+            self._matrix = self._build_matrix()
+        # the search relinks nodes as it goes and may be stopped part way, so work on a
+        # copy, which is much cheaper than building the matrix for every prefix
+        L, R, U, D, C, S, color, row_of = [list(a) for a in self._matrix[:-1]]
+        row_start = self._matrix[-1]
+        # option placed at each cell, -1 if empty
+        assigned = [-1] * self._n_tiles
+        corners = [
+            gidx for gidx in range(self._n_tiles) if self._canonical_corner[gidx]
+        ]
+
+        def hide(p: int):
+            # remove the other nodes of p's row from their columns, skipping nodes
+            # already purified (color < 0), which are left in place
+            q = R[p]
+            while q != p:
+                if color[q] >= 0:
+                    D[U[q]] = D[q]
+                    U[D[q]] = U[q]
+                    S[C[q]] -= 1
+                q = R[q]
+
+        def unhide(p: int):
+            q = L[p]
+            while q != p:
+                if color[q] >= 0:
+                    D[U[q]] = q
+                    U[D[q]] = q
+                    S[C[q]] += 1
+                q = L[q]
+
+        def cover(col: int):
+            R[L[col]] = R[col]
+            L[R[col]] = L[col]
+            i = D[col]
+            while i != col:
+                hide(i)
+                i = D[i]
+
+        def uncover(col: int):
+            i = U[col]
+            while i != col:
+                unhide(i)
+                i = U[i]
+            R[L[col]] = col
+            L[R[col]] = col
+
+        def purify(p: int):
+            # fix the colour of p's secondary column, removing rows that disagree
+            c = color[p]
+            col = C[p]
+            color[col] = c
+            q = D[col]
+            while q != col:
+                if color[q] == c:
+                    color[q] = -1
+                else:
+                    hide(q)
+                q = D[q]
+
+        def unpurify(p: int):
+            c = color[p]
+            col = C[p]
+            q = U[col]
+            while q != col:
+                if color[q] < 0:
+                    color[q] = c
+                else:
+                    unhide(q)
+                q = U[q]
+
+        def commit(p: int):
+            if color[p] == 0:
+                cover(C[p])
+            elif color[p] > 0:
+                purify(p)
+
+        def uncommit(p: int):
+            if color[p] == 0:
+                uncover(C[p])
+            elif color[p] > 0:
+                unpurify(p)
+
+        def breaks_symmetry(gidx: int, tidx: int) -> bool:
+            # the top left corner must hold a lower tile index than the other corners
+            if not corners:
+                return False
+            if gidx == 0:
+                return any(0 <= assigned[c] < 4 * tidx for c in corners)
+            if self._canonical_corner[gidx]:
+                return 0 <= assigned[0] and assigned[0] >> 2 > tidx
+            return False
+
+        def search() -> Iterator[List[TileState]]:
+            if R[0] == 0:
+                self.state = [TileState(tidx=o >> 2, ridx=o & 3) for o in assigned]
+                yield self.state
+                return
+            # choose the primary column with the fewest rows
+            col = R[0]
+            best = S[col]
+            j = R[col]
+            while j != 0 and best > 0:
+                if S[j] < best:
+                    col = j
+                    best = S[j]
+                j = R[j]
+            if best == 0:
+                return
+            cover(col)
+            r = D[col]
+            while r != col:
+                if max_states is not None and self._states_checked >= max_states:
+                    self._stopped = True
+                elif (
+                    should_stop is not None
+                    and self._states_checked % STOP_CHECK_INTERVAL == 0
+                    and should_stop()
+                ):
+                    self._stopped = True
+                if self._stopped:
+                    break
+                self._states_checked += 1
+                gidx, option = row_of[r]
+                if not breaks_symmetry(gidx, option >> 2):
+                    j = R[r]
+                    while j != r:
+                        commit(j)
+                        j = R[j]
+                    assigned[gidx] = option
+                    yield from search()
+                    assigned[gidx] = -1
+                    j = L[r]
+                    while j != r:
+                        uncommit(j)
+                        j = L[j]
+                r = D[r]
+            uncover(col)
+
+        def select_prefix() -> bool:
+            # place the prefix as the search would, returning False if it can't be
+            for gidx, tile_state in enumerate(self.state[: self._prefix_len]):
+                option = 4 * tile_state.tidx + tile_state.ridx
+                r = row_start.get((gidx, option))
+                col = 1 + gidx
+                if r is None or R[L[col]] != col:
+                    return False
+                # the row must still be in its cell's column
+                i = D[col]
+                while i != col and i != r:
+                    i = D[i]
+                if i != r or breaks_symmetry(gidx, tile_state.tidx):
+                    return False
+                cover(col)
+                j = R[r]
+                while j != r:
+                    commit(j)
+                    j = R[j]
+                assigned[gidx] = option
+            return True
+
+        self._stopped = False
+        if select_prefix():
+            yield from search()
+        self._search_complete = not self._stopped
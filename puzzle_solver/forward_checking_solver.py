@@ -0,0 +1,175 @@
+from typing import Callable, Iterator, List, Optional
+
+from puzzle_solver import GridState, TileState, Tile, STOP_CHECK_INTERVAL
+
+
+class ForwardCheckingGridState(GridState):
+    """GridState that searches with forward checking rather than in raster order.
+
+    Every empty cell keeps a domain of the (tile, rotation) options still possible
+    there, stored as a bitset with bit 4 * tidx + ridx set for each option.  After each
+    placement, the tile is removed from every domain and the neighbouring domains are
+    restricted to options with a compatible edge.  The search always branches on the
+    empty cell with the smallest domain, and backtracks as soon as any domain is empty.
+    """
+
+    def __init__(
+        self,
+        dx: int,
+        dy: int,
+        tiles: List[Tile],
+        break_symmetry: bool = False,
+    ):
+        super().__init__(dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry)
+        n_options = 4 * self._n_tiles
+        edges = [
+            [
+                self._edge_lookup(TileState(tidx=o // 4, ridx=o % 4), edge)
+                for edge in "NESW"
+            ]
+            for o in range(n_options)
+        ]
+
+        def _compat_mask(edge_idx: int, neighbor_edge_idx: int) -> List[int]:
+            # for each option, the mask of options whose 'neighbor_edge_idx' edge is
+            # compatible with this option's 'edge_idx' edge
+            masks = []
+            for o in range(n_options):
+                mask = 0
+                for o2 in range(n_options):
+                    edge = edges[o][edge_idx]
+                    if self._compatible(edge, edges[o2][neighbor_edge_idx]):
+                        mask |= 1 << o2
+                masks.append(mask)
+            return masks
+
+        self._north_of = _compat_mask(0, 2)
+        self._east_of = _compat_mask(1, 3)
+        self._south_of = _compat_mask(2, 0)
+        self._west_of = _compat_mask(3, 1)
+        self._tile_mask = [0b1111 << (4 * tidx) for tidx in range(self._n_tiles)]
+        self._full_domain = 0
+        for tidx in range(self._n_tiles):
+            for ridx in range(self._max_ridx[tidx] + 1):
+                self._full_domain |= 1 << (4 * tidx + ridx)
+        # (neighbour cell, mask lookup) for each cell
+        self._neighbors = []
+        for gidx in range(self._n_tiles):
+            gy = gidx // self.dx
+            gx = gidx % self.dx
+            neighbors = []
+            if gy > 0:
+                neighbors.append((gidx - self.dx, self._north_of))
+            if gx < self.dx - 1:
+                neighbors.append((gidx + 1, self._east_of))
+            if gy < self.dy - 1:
+                neighbors.append((gidx + self.dx, self._south_of))
+            if gx > 0:
+                neighbors.append((gidx - 1, self._west_of))
+            self._neighbors.append(neighbors)
+        self._corners = [
+            gidx for gidx in range(self._n_tiles) if self._canonical_corner[gidx]
+        ]
+        # set if the search was stopped early by max_states or should_stop
+        self._stopped = False
+
+    def _place(
+        self, domains: List[int], assigned: List[int], gidx: int, option: int
+    ) -> Optional[List[int]]:
+        """Return the domains after placing option at gidx, or None if any empty cell
+        is left with no options."""
+        domains = list(domains)
+        domains[gidx] = 1 << option
+        not_tile = ~self._tile_mask[option >> 2]
+        for cell in range(self._n_tiles):
+            if assigned[cell] < 0 and cell != gidx:
+                domains[cell] &= not_tile
+        for cell, compat in self._neighbors[gidx]:
+            if assigned[cell] < 0:
+                domains[cell] &= compat[option]
+        if self._corners:
+            # tiles in the other corners must have a higher index than the top left
+            tidx = option >> 2
+            if gidx == 0:
+                for cell in self._corners:
+                    if assigned[cell] < 0:
+                        domains[cell] &= ~((1 << (4 * tidx)) - 1)
+            elif self._canonical_corner[gidx] and assigned[0] < 0:
+                domains[0] &= (1 << (4 * tidx)) - 1
+        for cell in range(self._n_tiles):
+            if assigned[cell] < 0 and cell != gidx and not domains[cell]:
+                return None
+        return domains
+
+    def _search(
+        self,
+        max_states: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[List[TileState]]:
+        # option placed at each cell, -1 if empty
+        assigned = [-1] * self._n_tiles
+        domains: Optional[List[int]] = [self._full_domain] * self._n_tiles
+        for gidx, tile_state in enumerate(self.state[: self._prefix_len]):
+            option = 4 * tile_state.tidx + tile_state.ridx
+            if not domains[gidx] & (1 << option):
+                domains = None
+                break
+            domains = self._place(domains, assigned, gidx, option)
+            if domains is None:
+                break
+            assigned[gidx] = option
+        self._stopped = False
+        if domains is not None:
+            n_empty = self._n_tiles - self._prefix_len
+            yield from self._search_domains(
+                domains, assigned, n_empty, max_states, should_stop
+            )
+        self._search_complete = not self._stopped
+
+    def _search_domains(
+        self,
+        domains: List[int],
+        assigned: List[int],
+        n_empty: int,
+        max_states: Optional[int],
+        should_stop: Optional[Callable[[], bool]],
+    ) -> Iterator[List[TileState]]:
+        if n_empty == 0:
+            self.state = [TileState(tidx=o >> 2, ridx=o & 3) for o in assigned]
+            yield self.state
+            return
+        # branch on the most constrained empty cell
+        gidx = -1
+        best = 4 * self._n_tiles + 1
+        for cell in range(self._n_tiles):
+            if assigned[cell] < 0:
+                size = domains[cell].bit_count()
+                if size < best:
+                    gidx = cell
+                    best = size
+        domain = domains[gidx]
+        while domain:
+            if max_states is not None and self._states_checked >= max_states:
+                self._stopped = True
+                return
+            if (
+                should_stop is not None
+                and self._states_checked % STOP_CHECK_INTERVAL == 0
+                and should_stop()
+            ):
+                self._stopped = True
+                return
+            low_bit = domain & -domain
+            domain ^= low_bit
+            option = low_bit.bit_length() - 1
+            self._states_checked += 1
+            new_domains = self._place(domains, assigned, gidx, option)
+            if new_domains is None:
+                continue
+            assigned[gidx] = option
+            yield from self._search_domains(
+                new_domains, assigned, n_empty - 1, max_states, should_stop
+            )
+            assigned[gidx] = -1
+            if self._stopped:
+                return
@@ -0,0 +1,159 @@
+from typing import List, Optional, Tuple, Type
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+from puzzle_solver import GridState, TileState, Tile, Solution
+
+# state shared with each worker process, set up by _init_worker
+_solver: Optional[GridState] = None
+_stop_event = None
+_shared_states_checked = None
+_shared_solutions_found = None
+_max_states: Optional[int] = None
+_max_solutions: Optional[int] = None
+
+
+def enumerate_prefixes(gs: GridState, depth: int) -> List[List[TileState]]:
+    """Return every valid partial state with 'depth' tiles placed.  Each is the root of
+    an independent subtree of the search.  Counts the states checked in gs."""
+    prefixes: List[List[TileState]] = [[]]
+    for _ in range(min(depth, gs._n_tiles)):
+        new_prefixes = []
+        for prefix in prefixes:
+            used = set([s.tidx for s in prefix])
+            for tidx in range(gs._n_tiles):
+                if tidx in used:
+                    continue
+                for ridx in range(gs._max_ridx[tidx] + 1):
+                    gs.state = prefix + [TileState(tidx=tidx, ridx=ridx)]
+                    gs._states_checked += 1
+                    if gs._check_current_state():
+                        new_prefixes.append(gs.state)
+        prefixes = new_prefixes
+    gs.state = []
+    return prefixes
+
+
+def _init_worker(
+    solver_cls: Type[GridState],
+    dx: int,
+    dy: int,
+    tiles: List[Tile],
+    break_symmetry: bool,
+    stop_event,
+    shared_states_checked,
+    shared_solutions_found,
+    max_states: Optional[int],
+    max_solutions: Optional[int],
+):
+    global _solver, _stop_event, _shared_states_checked, _shared_solutions_found
+    global _max_states, _max_solutions
+    # built once per worker and reused for every prefix, as solvers can do a lot of
+    # setup (compatibility masks, the dancing links matrix) in their constructor
+    _solver = solver_cls(dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry)
+    _stop_event = stop_event
+    _shared_states_checked = shared_states_checked
+    _shared_solutions_found = shared_solutions_found
+    _max_states = max_states
+    _max_solutions = max_solutions
+
+
+def _solve_prefix(prefix: List[TileState]) -> Tuple[int, List[Solution], bool]:
+    """Search the subtree below prefix with this worker's solver, returning (states
+    checked, solutions, whether the subtree was fully searched)"""
+    if _stop_event.is_set():
+        return 0, [], False
+    gs = _solver
+    gs._states_checked = 0
+    gs._search_complete = False
+    gs.set_prefix(prefix)
+    reported_states = 0
+
+    def should_stop() -> bool:
+        # add the states checked since the last poll to the count shared by all workers
+        nonlocal reported_states
+        if _max_states is not None:
+            with _shared_states_checked.get_lock():
+                _shared_states_checked.value += gs._states_checked - reported_states
+                reported_states = gs._states_checked
+                if _shared_states_checked.value >= _max_states:
+                    _stop_event.set()
+        return _stop_event.is_set()
+
+    solutions = []
+    for _ in gs._search(should_stop=should_stop):
+        solutions += gs._current_solutions()
+        if _max_solutions is not None:
+            with _shared_solutions_found.get_lock():
+                _shared_solutions_found.value += 1
+                if _shared_solutions_found.value >= _max_solutions:
+                    _stop_event.set()
+            if _stop_event.is_set():
+                break
+    return gs._states_checked, solutions, gs._search_complete
+
+
+def run_parallel_check(
+    gs: GridState,
+    n_workers: Optional[int] = None,
+    prefix_depth: int = 2,
+    max_states: Optional[int] = None,
+    expand_symmetric: bool = False,
+    max_solutions: Optional[int] = None,
+    count_only: bool = False,
+) -> bool:
+    """Parallel version of GridState.run_check.  The first prefix_depth placements are
+    enumerated, and the subtree below each is searched as a separate task on a process
+    pool.  Subtree sizes vary wildly, so tasks are handed out one at a time as workers
+    become free.  Solutions are printed and counted in gs as each task finishes, along
+    with the states checked by each worker.  Workers use the same search strategy
+    (GridState subclass) as gs.  Once max_solutions solutions are found across all
+    workers, every worker stops.  Returns True if a solution is found."""
+    # always leave at least one tile for the workers to place
+    prefixes = enumerate_prefixes(gs, min(prefix_depth, gs._n_tiles - 1))
+    stop_event = mp.Event()
+    shared_states_checked = mp.Value("q", gs._states_checked)
+    shared_solutions_found = mp.Value("q", 0)
+    all_complete = True
+    n_found = 0
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(
+            type(gs),
+            gs.dx,
+            gs.dy,
+            gs.tiles,
+            gs.break_symmetry,
+            stop_event,
+            shared_states_checked,
+            shared_solutions_found,
+            max_states,
+            max_solutions,
+        ),
+    ) as executor:
+        futures = [executor.submit(_solve_prefix, prefix) for prefix in prefixes]
+        for future in as_completed(futures):
+            if future.cancelled():
+                all_complete = False
+                continue
+            states_checked, solutions, complete = future.result()
+            gs._states_checked += states_checked
+            all_complete = all_complete and complete
+            for solution in solutions:
+                gs.state = [TileState(tidx=s.tidx, ridx=s.ridx) for s in solution]
+                for expanded in gs._current_solutions(expand_symmetric):
+                    # checked per expanded solution, as in iter_solutions
+                    if max_solutions is not None and n_found >= max_solutions:
+                        break
+                    gs._solutions_found += 1
+                    n_found += 1
+                    if not count_only:
+                        print("Solution:")
+                        gs.print_state(expanded)
+            if max_solutions is not None and n_found >= max_solutions:
+                # stop handing out new subproblems; running ones see the stop event
+                for pending in futures:
+                    pending.cancel()
+    gs._search_complete = all_complete and not stop_event.is_set()
+    return n_found > 0
@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import math
+
+from puzzle_solver import GridState, TileState
+
+# DP state: (mask of used tiles, south edge label above each column, east edge label
+# of the cell to the left or -1 at the start of a row)
+ProfileState = Tuple[int, Tuple[int, ...], int]
+# each profile takes about 250 bytes, so this is about 250MB
+DEFAULT_MAX_PROFILES = 1_000_000
+
+
+def count_solutions(
+    gs: GridState, max_profiles: Optional[int] = DEFAULT_MAX_PROFILES
+) -> int:
+    """Count the solutions of gs without enumerating them.
+
+    The grid is swept cell by cell in raster order, keeping a table from the boundary
+    profile to the number of ways of reaching it.  The profile is the set of used tiles
+    plus the labels of the edges the next cells must match: the south edges of the last
+    dx cells placed and the east edge of the previous cell.  Partial solutions with the
+    same profile complete in exactly the same ways, so they are merged and counted
+    together rather than searched separately.
+
+    The count is stored in gs._solutions_found, and the number of transitions in
+    gs._states_checked.  If gs.break_symmetry is set, only one solution per symmetry
+    class is counted.  As soon as the number of profiles in a step exceeds
+    max_profiles (None for no limit), a ValueError is raised rather than running out
+    of memory.
+
+    Every tile is different, so the used-tile mask keeps partial solutions apart until
+    they use the same set of tiles, and in the first row almost nothing merges.  The
+    table grows with the number of valid partial placements of a row, which explodes
+    with grid width and with fewer symbols (more edges match).  In practice a 4x4
+    puzzle with 8 symbols takes a second, a 5x5 puzzle with 8 symbols needs about a
+    million profiles, and 5x5 with 4 symbols or 6x6 puzzles need many more.  For
+    those, a search such as ForwardCheckingGridState is the better tool.
+    """
+    labels = sorted(set(edge for tile in gs.tiles for edge in tile))
+    label_idx = {label: idx for idx, label in enumerate(labels)}
+    # compatible_with[l] is the list of labels that can sit against label l
+    compatible_with = [
+        [label_idx[other] for other in labels if gs._compatible(label, other)]
+        for label in labels
+    ]
+    # options indexed by (north label, west label), holding (tidx, south, east)
+    options: Dict[Tuple[int, int], List[Tuple[int, int, int]]] = defaultdict(list)
+    for tidx in range(gs._n_tiles):
+        for ridx in range(4):
+            state = TileState(tidx=tidx, ridx=ridx)
+            n, e, s, w = [label_idx[gs._edge_lookup(state, edge)] for edge in "NESW"]
+            options[(n, w)].append((tidx, s, e))
+    all_labels = list(range(len(labels)))
+
+    profile_limit = math.inf if max_profiles is None else max_profiles
+    profiles: Dict[ProfileState, int] = {(0, (-1,) * gs.dx, -1): 1}
+    for gidx in range(gs._n_tiles):
+        gx = gidx % gs.dx
+        last_in_row = gx == gs.dx - 1
+        new_profiles: Dict[ProfileState, int] = defaultdict(int)
+        for (used, south, east), count in profiles.items():
+            north_labels = compatible_with[south[gx]] if south[gx] >= 0 else all_labels
+            west_labels = compatible_with[east] if east >= 0 else all_labels
+            for n in north_labels:
+                for w in west_labels:
+                    for tidx, s, e in options.get((n, w), ()):
+                        gs._states_checked += 1
+                        if used & (1 << tidx):
+                            continue
+                        new_south = south[:gx] + (s,) + south[gx + 1 :]
+                        key = (used | (1 << tidx), new_south, -1 if last_in_row else e)
+                        new_profiles[key] += count
+                        # checked as profiles are added, before the table outgrows
+                        # the limit
+                        if len(new_profiles) > profile_limit:
+                            raise ValueError(
+                                f"More than {max_profiles} profiles at grid index "
+                                f"{gidx}"
+                            )
+        profiles = new_profiles
+
+    n_solutions = sum(profiles.values())
+    if gs.break_symmetry:
+        # every symmetry class has one member per rotation, see GridState
+        n_solutions //= len(gs.symmetry_rotations())
+    gs._solutions_found = n_solutions
+    gs._search_complete = True
+    return n_solutions
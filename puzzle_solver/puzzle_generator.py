@@ -0,0 +1,68 @@
+from typing import List, Optional, Tuple
+import random
+
+from puzzle_solver import Tile, TileState
+
+# symbols used by the original puzzle in puzzle_solver.py
+DEFAULT_SYMBOLS = "SEJM"
+
+
+def _random_edge(rng: random.Random, symbols: str) -> Tuple[str, str]:
+    """Returns a matching pair of edges, e.g. ('S1', 'S2') or ('J2', 'J1')"""
+    symbol = rng.choice(symbols)
+    if rng.random() < 0.5:
+        return f"{symbol}1", f"{symbol}2"
+    return f"{symbol}2", f"{symbol}1"
+
+
+def generate_puzzle(
+    dx: int,
+    dy: int,
+    symbols: str = DEFAULT_SYMBOLS,
+    seed: Optional[int] = None,
+) -> Tuple[List[Tile], List[TileState]]:
+    """Generate a random edge-matching puzzle of size dx by dy that is guaranteed to
+    have at least one solution.
+
+    A solved grid is built first by choosing a random matching edge pair for every
+    interior edge (and a random edge for every border edge), then the tiles are shuffled
+    and rotated.  Returns the list of tiles (in N, E, S, W order, as in TILES) along with
+    the known solution as a list of TileState in grid order.
+    """
+    if dx < 1 or dy < 1:
+        raise ValueError("Grid must have at least one row and one column")
+    if not symbols:
+        raise ValueError("Need at least one symbol")
+    rng = random.Random(seed)
+    n_tiles = dx * dy
+
+    # edges of the solved grid, in N, E, S, W order as seen in the grid
+    placed: List[List[str]] = [["", "", "", ""] for _ in range(n_tiles)]
+    for gidx in range(n_tiles):
+        gy = gidx // dx
+        gx = gidx % dx
+        if gx == 0:
+            placed[gidx][3] = _random_edge(rng, symbols)[0]
+        if gy == 0:
+            placed[gidx][0] = _random_edge(rng, symbols)[0]
+        if gx < dx - 1:
+            placed[gidx][1], placed[gidx + 1][3] = _random_edge(rng, symbols)
+        else:
+            placed[gidx][1] = _random_edge(rng, symbols)[0]
+        if gy < dy - 1:
+            placed[gidx][2], placed[gidx + dx][0] = _random_edge(rng, symbols)
+        else:
+            placed[gidx][2] = _random_edge(rng, symbols)[0]
+
+    # shuffle tile order; order[gidx] is the tile index placed at grid index gidx
+    order = list(range(n_tiles))
+    rng.shuffle(order)
+    tiles: List[Tile] = [[] for _ in range(n_tiles)]
+    solution: List[TileState] = []
+    for gidx, tidx in enumerate(order):
+        ridx = rng.randrange(4)
+        # GridState looks up edge i of a tile with rotation r as tile[(i + r) % 4], so
+        # store the placed edges rotated back by r
+        tiles[tidx] = [placed[gidx][(eidx - ridx) % 4] for eidx in range(4)]
+        solution.append(TileState(tidx=tidx, ridx=ridx))
+    return tiles, solution
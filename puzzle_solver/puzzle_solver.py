@@ -1,4 +1,14 @@
-from typing import List, Dict, Set
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
 from dataclasses import dataclass
 import math
 
@@ -15,6 +25,9 @@ t8 = ["E2", "S1", "M1", "E1"]
 
 TILES = [t0, t1, t2, t3, t4, t5, t6, t7, t8]
 
+# how often (in states checked) the search polls for a request to stop
+STOP_CHECK_INTERVAL = 4096
+
 
 @dataclass
 class TileState:
@@ -22,8 +35,17 @@ class TileState:
     ridx: int
 
 
+class PlacedTile(NamedTuple):
+    """Immutable version of TileState, used for solutions handed back to callers"""
+
+    tidx: int
+    ridx: int
+
+
 Edge = str
 Tile = List[Edge]
+# a solution is the placed tile at each grid index, in raster order
+Solution = Sequence[PlacedTile]
 
 
 class GridState:
@@ -32,22 +54,44 @@ class GridState:
         dx: int,
         dy: int,
         tiles: List[Tile],
+        break_symmetry: bool = False,
     ):
         self.dx = dx
         self.dy = dy
         self.tiles = tiles
+        self.break_symmetry = break_symmetry
         # The current state being checked.  It consists of a valid list of tiles plus a
         # final tile that is being "tested".
         self.state: List[TileState] = []
+        # number of leading tiles in self.state that are fixed, see set_prefix
+        self._prefix_len = 0
         self._edge_idx: Dict[str, int] = {"N": 0, "E": 1, "S": 2, "W": 3}
         # the set of tiles already used; does not include current tile being "tested"
         self._used_tile_indices: Set[int] = set()
         self._n_tiles = self.dx * self.dy
         if len(self.tiles) != self._n_tiles:
             raise ValueError("Error, wrong number of tiles for grid size")
+        # Rotating a whole solution gives another solution (by 90 degrees for a square
+        # grid, only 180 degrees otherwise).  When breaking symmetry we constrain the
+        # search so it only finds one solution per symmetry class.
+        self._canonical_corner = [False] * self._n_tiles
+        self._max_ridx = [3] * self._n_tiles
+        if self.break_symmetry:
+            if self.dx == self.dy and self._n_tiles > 1:
+                # each 90 degree rotation moves a different corner to the top left, so
+                # only accept the solution with the lowest tile index in the top left
+                # corner.  This is checked as each other corner is placed.
+                for gidx in [self.dx - 1, (self.dy - 1) * self.dx, self._n_tiles - 1]:
+                    self._canonical_corner[gidx] = True
+            else:
+                # rotating the grid rotates every tile, so only allow tile 0 the
+                # rotations that can't be reached from each other by rotating the grid
+                self._max_ridx[0] = 4 // len(self.symmetry_rotations()) - 1
         # set up some counters for final stats
         self._states_checked = 0
         self._solutions_found = 0
+        # False if the search was stopped before the full space was explored
+        self._search_complete = False
 
     def _sanity_check_solution(self):
         """ensure that the current state is a valid solution"""
@@ -65,6 +109,11 @@ class GridState:
         if len(self.state) == 0:
             return True
         gidx = len(self.state) - 1
+        if (
+            self._canonical_corner[gidx]
+            and self.state[gidx].tidx < self.state[0].tidx
+        ):
+            return False
         return self._check_state(gidx)
 
     def _check_state(self, gidx: int):
@@ -74,7 +123,7 @@ class GridState:
         left_x = gx - 1
         up_y = gy - 1
         left_idx = gy * self.dx + left_x
-        up_idx = up_y * self.dy + gx
+        up_idx = up_y * self.dx + gx
         if left_x >= 0:
             left_state = self.state[left_idx]
             if not self._compatible(
@@ -89,6 +138,24 @@ class GridState:
                 return False
         return True
 
+    def _rejection_reason(self, gidx: int) -> Optional[str]:
+        """The constraint that rejects the tile at gidx ('symmetry', 'west' or 'north'),
+        or None if it is valid.  Only used for instrumentation, the search itself uses
+        _check_current_state."""
+        state = self.state[gidx]
+        if self._canonical_corner[gidx] and state.tidx < self.state[0].tidx:
+            return "symmetry"
+        if gidx % self.dx > 0 and not self._compatible(
+            self._edge_lookup(self.state[gidx - 1], "E"), self._edge_lookup(state, "W")
+        ):
+            return "west"
+        if gidx >= self.dx and not self._compatible(
+            self._edge_lookup(self.state[gidx - self.dx], "S"),
+            self._edge_lookup(state, "N"),
+        ):
+            return "north"
+        return None
+
     def _edge_lookup(self, state: TileState, edge: str) -> Edge:
         edge_idx = self._edge_idx[edge]
         return self.tiles[state.tidx][(edge_idx + state.ridx) % 4]
@@ -105,7 +172,7 @@ class GridState:
         rotations.  If all possibilities have been exhausted, return False."""
         state = self.state[-1]
         # print(f"incrementing {state}")
-        if state.ridx < 3:
+        if state.ridx < self._max_ridx[state.tidx]:
             state.ridx += 1
             return True
         state.ridx = 0
@@ -132,25 +199,75 @@ class GridState:
         # we're removing the last state, representing the exhauseted iteration (will
         # have an invalid tile index)
         state = self.state.pop()
-        # if there's nothing left, we've iterated over every possibility
-        if len(self.state) == 0:
+        # if there's nothing left (or only the fixed prefix), we've iterated over every
+        # possibility
+        if len(self.state) <= self._prefix_len:
             return False
         # we're now iterating over the last remaining state, so the 'used' states are
         # the previous ones (all but the last)
         self._used_tile_indices = set([s.tidx for s in self.state[:-1]])
         return True
 
-    def print_state(self):
-        for idx, state in enumerate(self.state):
+    def symmetry_rotations(self) -> List[int]:
+        """Counter-clockwise quarter turns of the whole grid that map the grid onto
+        itself"""
+        return [0, 1, 2, 3] if self.dx == self.dy else [0, 2]
+
+    def rotate_state(
+        self, state: List[TileState], quarter_turns: int
+    ) -> List[TileState]:
+        """Return the full grid state rotated counter-clockwise by quarter_turns"""
+        rotated = list(state)
+        dx, dy = self.dx, self.dy
+        for _ in range(quarter_turns % 4):
+            # (gx, gy) moves to (gy, dx - 1 - gx) in the rotated (dy wide) grid, and
+            # every tile gets one more ccw rotation
+            new_rotated = list(rotated)
+            for gidx, tile_state in enumerate(rotated):
+                gy = gidx // dx
+                gx = gidx % dx
+                new_rotated[(dx - 1 - gx) * dy + gy] = TileState(
+                    tidx=tile_state.tidx, ridx=(tile_state.ridx + 1) % 4
+                )
+            rotated = new_rotated
+            dx, dy = dy, dx
+        return rotated
+
+    def print_state(
+        self, state: Optional[Sequence[Union[TileState, PlacedTile]]] = None
+    ):
+        if state is None:
+            state = self.state
+        for idx, tile_state in enumerate(state):
             end = "\n\n" if (idx + 1) % self.dx == 0 else "    "
             print(
-                f"[idx: {(state.tidx+1):2d},  ccw rot: {(90*state.ridx):3d}]", end=end
+                f"[idx: {(tile_state.tidx+1):2d},  ccw rot: {(90*tile_state.ridx):3d}]",
+                end=end,
             )
         print()
 
-    def run_check(self) -> bool:
-        """Runs full search for solutions, returning True if one is found."""
+    def set_prefix(self, prefix: List[TileState]):
+        """Restrict the search to the subtree below a valid partial state, used to
+        split the search into independent subproblems."""
+        self.state = [TileState(tidx=s.tidx, ridx=s.ridx) for s in prefix]
+        self._prefix_len = len(self.state)
+
+    def _search(
+        self,
+        max_states: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[List[TileState]]:
+        """Iterative depth first search, yielding self.state each time it holds a
+        solution.  should_stop is polled every STOP_CHECK_INTERVAL states."""
         while True:
+            if max_states is not None and self._states_checked >= max_states:
+                return
+            if (
+                should_stop is not None
+                and self._states_checked % STOP_CHECK_INTERVAL == 0
+                and should_stop()
+            ):
+                return
             # returns True for initial empty state list
             self._states_checked += 1
             if self._check_current_state():
@@ -158,10 +275,7 @@ class GridState:
                 if self._push_tile():
                     continue
                 else:
-                    print("Solution:")
-                    self.print_state()
-                    self._sanity_check_solution()
-                    self._solutions_found += 1
+                    yield self.state
 
             while True:
                 if self._increment_current_state():
@@ -171,7 +285,63 @@ class GridState:
                     if self._pop_tile():
                         continue
                     else:
-                        return False
+                        self._search_complete = True
+                        return
+
+    def _current_solutions(self, expand_symmetric: bool = False) -> List[Solution]:
+        """Check the solution in self.state and return it as immutable placements.  If
+        break_symmetry is set, expand_symmetric also returns its rotated forms."""
+        self._sanity_check_solution()
+        if self.break_symmetry and expand_symmetric:
+            rotations = self.symmetry_rotations()
+        else:
+            rotations = [0]
+        return [
+            tuple(
+                PlacedTile(tidx=s.tidx, ridx=s.ridx)
+                for s in self.rotate_state(self.state, quarter_turns)
+            )
+            for quarter_turns in rotations
+        ]
+
+    def iter_solutions(
+        self,
+        max_solutions: Optional[int] = None,
+        max_states: Optional[int] = None,
+        expand_symmetric: bool = False,
+    ) -> Iterator[Solution]:
+        """Yield solutions as they are found, stopping after max_solutions solutions or
+        max_states states if given.  If break_symmetry is set, expand_symmetric yields
+        all rotated forms of each solution rather than just the representative."""
+        n_found = 0
+        for _ in self._search(max_states=max_states):
+            for solution in self._current_solutions(expand_symmetric):
+                self._solutions_found += 1
+                n_found += 1
+                yield solution
+                if max_solutions is not None and n_found >= max_solutions:
+                    return
+
+    def run_check(
+        self,
+        max_states: Optional[int] = None,
+        expand_symmetric: bool = False,
+        max_solutions: Optional[int] = None,
+        count_only: bool = False,
+    ) -> bool:
+        """Runs search for solutions, printing each one unless count_only is set, and
+        returning True if one is found.  See iter_solutions for the other options."""
+        found = False
+        for solution in self.iter_solutions(
+            max_solutions=max_solutions,
+            max_states=max_states,
+            expand_symmetric=expand_symmetric,
+        ):
+            found = True
+            if not count_only:
+                print("Solution:")
+                self.print_state(solution)
+        return found
 
     def print_final_stats(self):
         total_states = math.factorial(self._n_tiles) * 4 ** self._n_tiles
@@ -1,5 +1,101 @@
-from puzzle_solver import GridState, TILES
+import argparse
 
-gs = GridState(dx=3, dy=3, tiles=TILES)
-gs.run_check()
-gs.print_final_stats()
+from puzzle_solver import TILES
+from parallel_solver import run_parallel_check
+from solvers import SOLVERS
+from profile_counter import DEFAULT_MAX_PROFILES, count_solutions
+from search_instrumentation import SearchInstrumentation
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--strategy", default="raster", choices=list(SOLVERS))
+    parser.add_argument(
+        "--break_symmetry",
+        action="store_true",
+        help="only search for one solution per rotational symmetry class",
+    )
+    parser.add_argument(
+        "--expand_symmetric",
+        action="store_true",
+        help="with --break_symmetry, still output every rotated solution",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes to split the search across",
+    )
+    parser.add_argument(
+        "--first_only",
+        action="store_true",
+        help="stop as soon as a solution is found",
+    )
+    parser.add_argument(
+        "--max_solutions", type=int, help="stop after this many solutions"
+    )
+    parser.add_argument(
+        "--count_dp",
+        action="store_true",
+        help="count solutions by row-profile dynamic programming, without search",
+    )
+    parser.add_argument(
+        "--max_profiles",
+        type=int,
+        default=DEFAULT_MAX_PROFILES,
+        help="with --count_dp, give up once a step has more than this many profiles "
+        "(about 250 bytes each)",
+    )
+    parser.add_argument(
+        "--count_only",
+        action="store_true",
+        help="only count solutions, don't print them",
+    )
+    parser.add_argument(
+        "--stats_json",
+        help="write search instrumentation to this JSON file (with --workers 1)",
+    )
+    parser.add_argument(
+        "--progress",
+        type=float,
+        help="print search progress every this many seconds (with --workers 1)",
+    )
+    args = parser.parse_args()
+    if (args.stats_json or args.progress) and args.workers > 1:
+        # each worker searches with its own GridState, which isn't instrumented
+        parser.error("--stats_json and --progress need --workers 1")
+    if (args.stats_json or args.progress) and args.count_dp:
+        # count_solutions doesn't search, so there is nothing to instrument
+        parser.error("--stats_json and --progress can't be used with --count_dp")
+
+    gs = SOLVERS[args.strategy](
+        dx=3, dy=3, tiles=TILES, break_symmetry=args.break_symmetry
+    )
+    instrumentation = None
+    if args.stats_json or args.progress:
+        instrumentation = SearchInstrumentation(progress_seconds=args.progress)
+        instrumentation.attach(gs)
+    max_solutions = 1 if args.first_only else args.max_solutions
+    if args.count_dp:
+        try:
+            count_solutions(gs, max_profiles=args.max_profiles)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.workers > 1:
+        run_parallel_check(
+            gs,
+            n_workers=args.workers,
+            expand_symmetric=args.expand_symmetric,
+            max_solutions=max_solutions,
+            count_only=args.count_only,
+        )
+    else:
+        gs.run_check(
+            expand_symmetric=args.expand_symmetric,
+            max_solutions=max_solutions,
+            count_only=args.count_only,
+        )
+    gs.print_final_stats()
+    if instrumentation is not None:
+        instrumentation.print_summary()
+        if args.stats_json:
+            instrumentation.to_json(args.stats_json)
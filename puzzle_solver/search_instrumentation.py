@@ -0,0 +1,174 @@
+from typing import Dict, List, Optional
+from collections import defaultdict
+import json
+import time
+
+from puzzle_solver import GridState
+from forward_checking_solver import ForwardCheckingGridState
+
+
+class SearchInstrumentation:
+    """Collects search statistics from a GridState: states/sec sampled over time, nodes
+    and rejections per depth (and which constraint caused each rejection), and the time
+    to each solution.
+
+    attach() wraps methods on the GridState instance only, so searches without
+    instrumentation run exactly the same code as before.  Rates are sampled from the
+    stop poll every STOP_CHECK_INTERVAL states, which all search strategies support,
+    keeping at most one sample every sample_seconds (and one at the end) so long
+    searches don't collect huge numbers of samples.  Per depth statistics are
+    collected for the raster and forward checking searches.
+    """
+
+    def __init__(
+        self, progress_seconds: Optional[float] = None, sample_seconds: float = 0.5
+    ):
+        # if set, print a progress line at most this often
+        self.progress_seconds = progress_seconds
+        self.sample_seconds = sample_seconds
+        self.gs: Optional[GridState] = None
+        self.strategy = ""
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self.samples: List[Dict] = []
+        self.nodes_per_depth: List[int] = []
+        self.rejections_per_depth: Dict[str, List[int]] = defaultdict(list)
+        self.solution_seconds: List[float] = []
+        self._depth = 0
+        self._last_progress = 0.0
+        self._last_sample = 0.0
+
+    def attach(self, gs: GridState) -> "SearchInstrumentation":
+        self.gs = gs
+        self.strategy = type(gs).__name__
+        self.start_time = time.perf_counter()
+        self._last_progress = self.start_time
+        self._last_sample = self.start_time
+
+        search = gs._search
+        current_solutions = gs._current_solutions
+
+        def instrumented_search(max_states=None, should_stop=None):
+            def poll() -> bool:
+                self._sample()
+                return should_stop is not None and should_stop()
+
+            try:
+                yield from search(max_states=max_states, should_stop=poll)
+            finally:
+                self._sample(force=True)
+                self.end_time = time.perf_counter()
+
+        def instrumented_current_solutions(expand_symmetric: bool = False):
+            self.solution_seconds.append(time.perf_counter() - self.start_time)
+            return current_solutions(expand_symmetric)
+
+        gs._search = instrumented_search
+        gs._current_solutions = instrumented_current_solutions
+
+        if isinstance(gs, ForwardCheckingGridState):
+            place = gs._place
+
+            def instrumented_place(domains, assigned, gidx, option):
+                depth = sum(1 for o in assigned if o >= 0) + 1
+                self._count(self.nodes_per_depth, depth)
+                new_domains = place(domains, assigned, gidx, option)
+                if new_domains is None:
+                    self._count(self.rejections_per_depth["domain_wipeout"], depth)
+                self._depth = depth
+                return new_domains
+
+            gs._place = instrumented_place
+        elif type(gs)._search is GridState._search:
+            check_current_state = gs._check_current_state
+
+            def instrumented_check_current_state() -> bool:
+                valid = check_current_state()
+                depth = len(gs.state)
+                self._count(self.nodes_per_depth, depth)
+                if not valid:
+                    reason = gs._rejection_reason(depth - 1)
+                    self._count(self.rejections_per_depth[reason], depth)
+                self._depth = depth
+                return valid
+
+            gs._check_current_state = instrumented_check_current_state
+        return self
+
+    def _count(self, counts: List[int], depth: int):
+        while len(counts) <= depth:
+            counts.append(0)
+        counts[depth] += 1
+
+    def _sample(self, force: bool = False):
+        now = time.perf_counter()
+        if not force and now - self._last_sample < self.sample_seconds:
+            return
+        self._last_sample = now
+        states_checked = self.gs._states_checked
+        if self.samples:
+            last = self.samples[-1]
+            rate = (states_checked - last["states_checked"]) / max(
+                now - self.start_time - last["seconds"], 1e-9
+            )
+        else:
+            rate = states_checked / max(now - self.start_time, 1e-9)
+        self.samples.append(
+            {
+                "seconds": now - self.start_time,
+                "states_checked": states_checked,
+                "states_per_second": rate,
+                "depth": self._depth,
+            }
+        )
+        if (
+            self.progress_seconds is not None
+            and now - self._last_progress >= self.progress_seconds
+        ):
+            self._last_progress = now
+            print(
+                f"[{now - self.start_time:8.1f}s] {states_checked} states, "
+                f"{rate:.0f} states/s, depth {self._depth}, "
+                f"{self.gs._solutions_found} solutions",
+                flush=True,
+            )
+
+    def to_dict(self) -> Dict:
+        end_time = self.end_time or time.perf_counter()
+        return {
+            "strategy": self.strategy,
+            "dx": self.gs.dx,
+            "dy": self.gs.dy,
+            "seconds": end_time - self.start_time,
+            "states_checked": self.gs._states_checked,
+            "solutions_found": self.gs._solutions_found,
+            "complete": self.gs._search_complete,
+            "sample_seconds": self.sample_seconds,
+            "samples": self.samples,
+            "nodes_per_depth": self.nodes_per_depth,
+            "rejections_per_depth": dict(self.rejections_per_depth),
+            "solution_seconds": self.solution_seconds,
+        }
+
+    def to_json(self, path: str):
+        with open(path, "w") as fp:
+            json.dump(self.to_dict(), fp, indent=2)
+
+    def print_summary(self):
+        stats = self.to_dict()
+        print(f"Search took {stats['seconds']:.3f}s")
+        if stats["solution_seconds"]:
+            print(f"First solution after {stats['solution_seconds'][0]:.3f}s")
+        reasons = sorted(self.rejections_per_depth)
+        header = " ".join(f"{reason:>14s}" for reason in reasons)
+        print(f"{'depth':>5s} {'nodes':>12s} {header}")
+        for depth, nodes in enumerate(self.nodes_per_depth):
+            rejections = [
+                self.rejections_per_depth[r][depth]
+                if depth < len(self.rejections_per_depth[r])
+                else 0
+                for r in reasons
+            ]
+            print(
+                f"{depth:5d} {nodes:12d} " + " ".join(f"{r:14d}" for r in rejections)
+            )
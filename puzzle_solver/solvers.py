@@ -0,0 +1,12 @@
+from typing import Dict, Type
+
+from puzzle_solver import GridState
+from forward_checking_solver import ForwardCheckingGridState
+from dancing_links_solver import DancingLinksGridState
+
+# search strategies selectable by name from the command line scripts
+SOLVERS: Dict[str, Type[GridState]] = {
+    "raster": GridState,
+    "forward_checking": ForwardCheckingGridState,
+    "dancing_links": DancingLinksGridState,
+}
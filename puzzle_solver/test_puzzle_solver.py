@@ -1,42 +1,255 @@
-# %%
-from puzzle_solver import GridState, TileState, TILES
-
-#
-# Run Checks
-#
-# %%
-# The first 8 tiles are all valid in the default ordering (no rotations), here we check
-# the first row
-gs = GridState(dx=3, dy=3, tiles=TILES)
-gs.state = [TileState(tidx, 0) for tidx in range(2)]
-assert gs._check_current_tile()
-# %%
-# now check the first five tiles
-gs = GridState(dx=3, dy=3, tiles=TILES)
-gs.state = [TileState(tidx, 0) for tidx in range(5)]
-assert gs._check_current_tile()
-
-# %%
-# now check that we get False for all tiles
-gs = GridState(dx=3, dy=3, tiles=TILES)
-gs.state = [TileState(tidx, 0) for tidx in range(9)]
-assert not gs._check_current_tile()
-
-# %%
+import multiprocessing as mp
+
+from puzzle_solver import GridState, TileState, PlacedTile, TILES
+from puzzle_generator import generate_puzzle
+import parallel_solver
+from parallel_solver import enumerate_prefixes, run_parallel_check
+from forward_checking_solver import ForwardCheckingGridState
+from dancing_links_solver import DancingLinksGridState
+from profile_counter import count_solutions
+from search_instrumentation import SearchInstrumentation
+
 # This is a full solution
-solution_state = [
-    TileState(tidx=1, ridx=2),
-    TileState(tidx=9, ridx=3),
+SOLUTION_STATE = [
+    TileState(tidx=0, ridx=2),
+    TileState(tidx=8, ridx=3),
+    TileState(tidx=5, ridx=2),
+    TileState(tidx=2, ridx=0),
+    TileState(tidx=4, ridx=0),
+    TileState(tidx=7, ridx=0),
+    TileState(tidx=1, ridx=3),
+    TileState(tidx=3, ridx=2),
     TileState(tidx=6, ridx=2),
-    TileState(tidx=3, ridx=0),
-    TileState(tidx=5, ridx=0),
-    TileState(tidx=8, ridx=0),
-    TileState(tidx=2, ridx=3),
-    TileState(tidx=4, ridx=2),
-    TileState(tidx=7, ridx=2),
 ]
-gs = GridState(dx=3, dy=3, tiles=TILES)
-assert gs._check_current_tile()
 
 
-# %%
+def test_check_current_state():
+    # The first 8 tiles are all valid in the default ordering (no rotations), here we
+    # check the first row
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    gs.state = [TileState(tidx, 0) for tidx in range(2)]
+    assert gs._check_current_state()
+
+    # now check the first five tiles
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    gs.state = [TileState(tidx, 0) for tidx in range(5)]
+    assert gs._check_current_state()
+
+    # now check that we get False for all tiles
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    gs.state = [TileState(tidx, 0) for tidx in range(9)]
+    assert not gs._check_current_state()
+
+
+def test_solution():
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    gs.state = list(SOLUTION_STATE)
+    gs._sanity_check_solution()
+
+
+def test_run_check():
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    gs.run_check()
+    assert gs._search_complete
+    assert gs._solutions_found == 8
+
+
+def test_generate_puzzle():
+    for dx, dy in [(3, 3), (4, 2), (2, 5)]:
+        tiles, solution = generate_puzzle(dx, dy, seed=0)
+        assert len(tiles) == dx * dy
+        gs = GridState(dx=dx, dy=dy, tiles=tiles)
+        gs.state = solution
+        gs._sanity_check_solution()
+
+        # same seed gives the same puzzle
+        assert generate_puzzle(dx, dy, seed=0)[0] == tiles
+
+        # the search must find the generated solution
+        gs = GridState(dx=dx, dy=dy, tiles=tiles)
+        gs.run_check()
+        assert gs._search_complete
+        assert gs._solutions_found > 0
+
+
+def test_break_symmetry():
+    for dx, dy in [(3, 3), (4, 3), (1, 1)]:
+        tiles, _ = generate_puzzle(dx, dy, symbols="ABCDEFGH", seed=1)
+        gs = GridState(dx=dx, dy=dy, tiles=tiles)
+        gs.run_check()
+        gs_sym = GridState(dx=dx, dy=dy, tiles=tiles, break_symmetry=True)
+        gs_sym.run_check()
+        n_rotations = len(gs_sym.symmetry_rotations())
+        assert gs_sym._solutions_found * n_rotations == gs._solutions_found
+        assert gs_sym._states_checked <= gs._states_checked
+
+        gs_sym = GridState(dx=dx, dy=dy, tiles=tiles, break_symmetry=True)
+        gs_sym.run_check(expand_symmetric=True)
+        assert gs_sym._solutions_found == gs._solutions_found
+
+
+def test_rotate_state():
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    for quarter_turns in range(4):
+        gs.state = gs.rotate_state(SOLUTION_STATE, quarter_turns)
+        gs._sanity_check_solution()
+    assert gs.rotate_state(SOLUTION_STATE, 4) == SOLUTION_STATE
+
+
+def test_parallel_check():
+    tiles, _ = generate_puzzle(4, 3, symbols="ABCDEFGH", seed=1)
+    gs = GridState(dx=4, dy=3, tiles=tiles)
+    gs.run_check()
+    gs_parallel = GridState(dx=4, dy=3, tiles=tiles)
+    assert run_parallel_check(gs_parallel, n_workers=2)
+    assert gs_parallel._search_complete
+    assert gs_parallel._solutions_found == gs._solutions_found
+
+    gs_parallel = GridState(dx=4, dy=3, tiles=tiles)
+    assert run_parallel_check(gs_parallel, n_workers=2, max_solutions=1)
+    assert gs_parallel._solutions_found == 1
+
+    # the limit applies to the rotated forms, not just the representatives
+    gs_parallel = GridState(dx=3, dy=3, tiles=TILES, break_symmetry=True)
+    assert run_parallel_check(
+        gs_parallel,
+        n_workers=2,
+        max_solutions=1,
+        expand_symmetric=True,
+        count_only=True,
+    )
+    assert gs_parallel._solutions_found == 1
+
+
+def test_forward_checking():
+    for dx, dy, break_symmetry in [(3, 3, False), (3, 3, True), (4, 3, True)]:
+        tiles, _ = generate_puzzle(dx, dy, symbols="ABCDEF", seed=2)
+        gs = GridState(dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry)
+        gs.run_check()
+        gs_fc = ForwardCheckingGridState(
+            dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry
+        )
+        gs_fc.run_check()
+        assert gs_fc._search_complete
+        assert gs_fc._solutions_found == gs._solutions_found
+        assert gs_fc._states_checked < gs._states_checked
+
+    gs_fc = ForwardCheckingGridState(dx=3, dy=3, tiles=TILES)
+    run_parallel_check(gs_fc, n_workers=2)
+    assert gs_fc._solutions_found == 8
+
+
+def test_iter_solutions():
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    solutions = list(gs.iter_solutions())
+    assert len(solutions) == 8
+    assert tuple(PlacedTile(s.tidx, s.ridx) for s in SOLUTION_STATE) in solutions
+    assert isinstance(solutions[0], tuple)
+
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    assert len(list(gs.iter_solutions(max_solutions=3))) == 3
+    assert not gs._search_complete
+
+    gs = GridState(dx=3, dy=3, tiles=TILES, break_symmetry=True)
+    assert gs.run_check(count_only=True, expand_symmetric=True)
+    assert gs._solutions_found == 8
+
+
+def test_dancing_links():
+    for dx, dy, break_symmetry in [(3, 3, False), (3, 3, True), (4, 3, True)]:
+        tiles, _ = generate_puzzle(dx, dy, symbols="ABCDEF", seed=2)
+        gs = GridState(dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry)
+        gs_dlx = DancingLinksGridState(
+            dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry
+        )
+        assert set(gs_dlx.iter_solutions()) == set(gs.iter_solutions())
+        assert gs_dlx._search_complete
+
+    gs_dlx = DancingLinksGridState(dx=3, dy=3, tiles=TILES)
+    run_parallel_check(gs_dlx, n_workers=2, count_only=True)
+    assert gs_dlx._solutions_found == 8
+
+
+def test_solve_prefixes_with_one_solver():
+    # each worker reuses one solver for all its prefixes, so the subtree searches must
+    # not depend on what it searched before
+    tiles, _ = generate_puzzle(4, 3, symbols="ABCDEF", seed=2)
+    for solver_cls in [GridState, ForwardCheckingGridState, DancingLinksGridState]:
+        for break_symmetry in [False, True]:
+            gs = solver_cls(dx=4, dy=3, tiles=tiles, break_symmetry=break_symmetry)
+            expected = set(gs.iter_solutions())
+            parallel_solver._init_worker(
+                solver_cls,
+                4,
+                3,
+                tiles,
+                break_symmetry,
+                mp.Event(),
+                mp.Value("q", 0),
+                mp.Value("q", 0),
+                None,
+                None,
+            )
+            solutions = []
+            for prefix in enumerate_prefixes(gs, 2):
+                _, prefix_solutions, complete = parallel_solver._solve_prefix(prefix)
+                assert complete
+                solutions += prefix_solutions
+            assert len(solutions) == len(expected)
+            assert set(solutions) == expected
+
+
+def test_count_solutions():
+    assert count_solutions(GridState(dx=3, dy=3, tiles=TILES)) == 8
+    for dx, dy, symbols in [(3, 3, "AB"), (4, 2, "ABC"), (3, 2, "A")]:
+        for break_symmetry in [False, True]:
+            tiles, _ = generate_puzzle(dx, dy, symbols=symbols, seed=3)
+            gs = ForwardCheckingGridState(
+                dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry
+            )
+            gs.run_check(count_only=True)
+            gs_dp = GridState(dx=dx, dy=dy, tiles=tiles, break_symmetry=break_symmetry)
+            assert count_solutions(gs_dp) == gs._solutions_found
+
+    # the limit stops the first step part way through, not after building it
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    try:
+        count_solutions(gs, max_profiles=2)
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "grid index 0" in str(e)
+    assert gs._states_checked < 4 * len(TILES)
+
+
+def test_search_instrumentation():
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    instrumentation = SearchInstrumentation().attach(gs)
+    gs.run_check(count_only=True)
+    stats = instrumentation.to_dict()
+    assert sum(stats["nodes_per_depth"]) == gs._states_checked
+    assert len(stats["solution_seconds"]) == 8
+    assert set(stats["rejections_per_depth"]) == {"west", "north"}
+    assert stats["samples"]
+
+    # samples are limited by time, but there is always one at the end
+    gs = GridState(dx=3, dy=3, tiles=TILES)
+    instrumentation = SearchInstrumentation(sample_seconds=3600).attach(gs)
+    gs.run_check(count_only=True)
+    (sample,) = instrumentation.samples
+    assert sample["states_checked"] == gs._states_checked
+
+
+if __name__ == "__main__":
+    test_check_current_state()
+    test_solution()
+    test_run_check()
+    test_generate_puzzle()
+    test_break_symmetry()
+    test_rotate_state()
+    test_parallel_check()
+    test_forward_checking()
+    test_iter_solutions()
+    test_dancing_links()
+    test_solve_prefixes_with_one_solver()
+    test_count_solutions()
+    test_search_instrumentation()
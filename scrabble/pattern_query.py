@@ -0,0 +1,217 @@
+"""
+Crossword style pattern queries over a word list, e.g. every word of 4 to 8
+letters matching 'b?a*st' that can be made with the letters 'aetr.' (with
+'.' a blank, as in scrabble_cheat).
+
+Patterns are made of letters (already on the board), '?' (exactly one letter)
+and '*' (any number of letters, including none).  If a rack is given, the
+letters matched by '?' and '*' must come from it.
+
+Words are grouped by length.  For each length there is a matrix of letter
+indices and, for each (position, letter), a bitset of the words with that
+letter there (a posting list, packed 8 words to a byte).  A pattern is
+expanded into fixed length templates for each length in range, and each
+template is matched by intersecting the bitsets of its letters, so whole
+groups of words are tested at once.  Results are produced lazily, shortest
+words first, so a limit or an early break skips the remaining lengths.
+"""
+import argparse
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+alphabet = "abcdefghijklmnopqrstuvwxyz"
+WILDCARD = "?"
+STAR = "*"
+BLANK = "."
+
+
+def parse_pattern(pattern: str) -> List[str]:
+    """Split a pattern into tokens, merging runs of '*'"""
+    tokens = []
+    for char in pattern.lower():
+        if char not in alphabet and char not in (WILDCARD, STAR):
+            raise ValueError(f"Unexpected character {char!r} in pattern {pattern!r}")
+        if char == STAR and tokens and tokens[-1] == STAR:
+            continue
+        tokens.append(char)
+    return tokens
+
+
+def _compositions(total: int, parts: int) -> Iterator[List[int]]:
+    """Every way of writing total as an ordered sum of parts non-negative ints"""
+    if parts == 1:
+        yield [total]
+        return
+    for first in range(total + 1):
+        for rest in _compositions(total - first, parts - 1):
+            yield [first] + rest
+
+
+def expand_pattern(tokens: List[str], length: int) -> Iterator[str]:
+    """Fixed length templates (letters and '?') for a parsed pattern: each '*'
+    becomes some number of '?' so that the template has the given length"""
+    n_stars = tokens.count(STAR)
+    extra = length - (len(tokens) - n_stars)
+    if extra < 0 or (n_stars == 0 and extra > 0):
+        return
+    if n_stars == 0:
+        yield "".join(tokens)
+        return
+    for sizes in _compositions(extra, n_stars):
+        sizes_iter = iter(sizes)
+        yield "".join(
+            WILDCARD * next(sizes_iter) if token == STAR else token for token in tokens
+        )
+
+
+class PatternIndex:
+    def __init__(self, words: Iterable[str]):
+        by_length: Dict[int, List[str]] = {}
+        for word in {word.strip().lower() for word in words}:
+            if word and all(letter in alphabet for letter in word):
+                by_length.setdefault(len(word), []).append(word)
+        self.words: Dict[int, List[str]] = {}
+        # letter indices, (n_words, length) for each length
+        self.letters: Dict[int, np.ndarray] = {}
+        # packed bitsets, (length, 26, ceil(n_words / 8)) for each length
+        self.postings: Dict[int, np.ndarray] = {}
+        for length, length_words in sorted(by_length.items()):
+            length_words.sort()
+            letters = (
+                np.frombuffer("".join(length_words).encode("ascii"), dtype=np.uint8)
+                - ord("a")
+            ).reshape(len(length_words), length)
+            postings = np.stack(
+                [
+                    np.packbits(
+                        letters[:, position, np.newaxis] == np.arange(len(alphabet)),
+                        axis=0,
+                    ).T
+                    for position in range(length)
+                ]
+            )
+            self.words[length] = length_words
+            self.letters[length] = letters
+            self.postings[length] = postings
+
+    @property
+    def max_length(self) -> int:
+        return max(self.words) if self.words else 0
+
+    def _template_matches(
+        self, template: str, rack_counts: Optional[np.ndarray], n_blanks: int
+    ) -> np.ndarray:
+        """Indices of the words of len(template) matching it (and the rack)"""
+        length = len(template)
+        postings = self.postings[length]
+        n_words = len(self.words[length])
+        mask = np.full(postings.shape[2], 0xFF, dtype=np.uint8)
+        open_positions = []
+        for position, char in enumerate(template):
+            if char == WILDCARD:
+                open_positions.append(position)
+            else:
+                mask &= postings[position, alphabet.index(char)]
+        if rack_counts is not None and n_blanks == 0:
+            # without blanks, each open position must hold one of the rack letters
+            rack_letters = np.flatnonzero(rack_counts)
+            for position in open_positions:
+                mask &= np.bitwise_or.reduce(postings[position, rack_letters], axis=0)
+        indices = np.flatnonzero(np.unpackbits(mask, count=n_words))
+        if rack_counts is None or len(indices) == 0:
+            return indices
+        # check there are enough of each letter, using blanks to make up the rest
+        letters = self.letters[length][indices]
+        counts = np.zeros((len(indices), len(alphabet)), dtype=np.int64)
+        rows = np.arange(len(indices))
+        for position in open_positions:
+            counts[rows, letters[:, position]] += 1
+        shortfall = np.maximum(counts - rack_counts, 0).sum(axis=1)
+        return indices[shortfall <= n_blanks]
+
+    def query(
+        self,
+        pattern: str,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        rack: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the words matching pattern, shortest first and then in
+        alphabetical order, stopping after limit words.  Without a '*' the
+        pattern fixes the length; with one, lengths default to everything from
+        the pattern's fixed length up.  rack restricts the letters that fill
+        '?' and '*' ('.' for a blank).
+        """
+        tokens = parse_pattern(pattern)
+        fixed_length = len(tokens) - tokens.count(STAR)
+        if min_length is None:
+            min_length = fixed_length
+        if max_length is None:
+            max_length = self.max_length if STAR in tokens else fixed_length
+        rack_counts = None
+        n_blanks = 0
+        if rack is not None:
+            rack = rack.lower()
+            n_blanks = rack.count(BLANK)
+            rack_counts = np.zeros(len(alphabet), dtype=np.int64)
+            for letter in rack.replace(BLANK, ""):
+                if letter not in alphabet:
+                    raise ValueError(f"Unexpected character {letter!r} in rack")
+                rack_counts[alphabet.index(letter)] += 1
+
+        n_found = 0
+        for length in range(max(min_length, 1), max_length + 1):
+            if length not in self.words:
+                continue
+            matches = [
+                self._template_matches(template, rack_counts, n_blanks)
+                for template in expand_pattern(tokens, length)
+            ]
+            if not matches:
+                continue
+            # a word can match several templates when there are several '*'
+            for index in np.unique(np.concatenate(matches)):
+                if limit is not None and n_found >= limit:
+                    return
+                n_found += 1
+                yield self.words[length][index]
+
+
+if __name__ == "__main__":
+    from scrabble_cheat import dict_set, dictionary, load_dictionary
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "pattern",
+        help="letters on the board, '?' for one letter and '*' for any number, "
+        "e.g. 'b?a*st'",
+    )
+    parser.add_argument("--min_length", type=int, default=None)
+    parser.add_argument("--max_length", type=int, default=None)
+    parser.add_argument(
+        "--rack",
+        default=None,
+        help="letters in your hand ('.' for blank) to fill the '?' and '*' with",
+    )
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--dictionary", default=dictionary)
+    args = parser.parse_args()
+
+    if args.dictionary == dictionary:
+        words = dict_set
+    else:
+        words = load_dictionary(args.dictionary)
+    if not words:
+        parser.error(f"dictionary {args.dictionary} not found")
+    index = PatternIndex(words)
+    for word in index.query(
+        args.pattern,
+        min_length=args.min_length,
+        max_length=args.max_length,
+        rack=args.rack,
+        limit=args.limit,
+    ):
+        print(word)
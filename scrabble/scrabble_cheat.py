@@ -1,7 +1,7 @@
 import os
 import re
 import itertools
-from typing import List
+from typing import List, Optional, Set
 import argparse
 
 # dictionary = "words_alpha.txt"
@@ -10,10 +10,14 @@ dictionary = "scrabble_words_2019.txt"
 alphabet = "abcdefghijklmnopqrstuvwxyz"
 
 
-with open(dictionary) as fp:
-    text = fp.read().lower()
+def load_dictionary(path: str) -> Set[str]:
+    with open(path) as fp:
+        text = fp.read().lower()
+    return set([word.strip() for word in text.split("\n")])
 
-dict_set = set([word.strip() for word in text.split("\n")])
+
+# matching_words can be given another dictionary if this one isn't present
+dict_set = load_dictionary(dictionary) if os.path.exists(dictionary) else set()
 
 
 def merge_to_form(letters: str, form: str, letter_indices: List[int]):
@@ -38,12 +42,15 @@ def expand_blanks(word: str):
                 words_queue.append(new_word)
     
 
-def matching_words(letters: str, form: str):
+def matching_words(letters: str, form: str, words: Optional[Set[str]] = None):
     """
     Given a set of letters (possibly including blanks ('.') and a
     "form" consisting of available letters and open positions ('_'),
-    return valid scrabble words that can be played.
+    return valid scrabble words that can be played.  words is the
+    dictionary to use, by default dict_set.
     """
+    if words is None:
+        words = dict_set
 
     letter_indices = [idx for idx, char in enumerate(form) if char == "_"]
     num_letters = len(letter_indices)
@@ -57,7 +64,7 @@ def matching_words(letters: str, form: str):
     # expand any blanks with all possible completions
     possible_words = set(itertools.chain(*[expand_blanks(word) for word in possible_words]))
     # find all valid words within possible words
-    valid_words = list(dict_set.intersection(possible_words))
+    valid_words = list(words.intersection(possible_words))
     return valid_words
 
 
@@ -67,6 +74,8 @@ if __name__ == "__main__":
     parser.add_argument("letters", help="the list of letters in your hand ('.' for blank), e.g. 'hllomp.'")
     parser.add_argument("form", help="The spaces you'd like to fill with a word, including letters on the board.  For instance, 'b___ast' assumes the 'b' and 'ast' are on the board, with three spaces separating them.")
     args = parser.parse_args()
+    if not dict_set:
+        parser.error(f"dictionary {dictionary} not found")
     words = matching_words(letters=args.letters, form=args.form)
     print(words)
 
@@ -0,0 +1,89 @@
+import re
+
+from pattern_query import PatternIndex, expand_pattern, parse_pattern
+
+WORDS = [
+    "beast",
+    "blast",
+    "boast",
+    "breast",
+    "breakfast",
+    "broadcast",
+    "bat",
+    "bats",
+    "best",
+    "bast",
+    "ballast",
+    "beat",
+    "east",
+    "feast",
+    "least",
+    "toast",
+    "Boast",
+    "b-a",
+]
+
+
+def brute_force(pattern, min_length, max_length, rack=None):
+    regex = re.compile(pattern.replace("?", ".").replace("*", ".*") + "$")
+    words = sorted(
+        {word.lower() for word in WORDS if word.isalpha()},
+        key=lambda word: (len(word), word),
+    )
+    return [
+        word
+        for word in words
+        if min_length <= len(word) <= max_length and regex.match(word)
+    ]
+
+
+def test_expand_pattern():
+    tokens = parse_pattern("b?a**st")
+    assert tokens == ["b", "?", "a", "*", "s", "t"]
+    assert list(expand_pattern(tokens, 4)) == []
+    assert list(expand_pattern(tokens, 5)) == ["b?ast"]
+    assert list(expand_pattern(tokens, 7)) == ["b?a??st"]
+    assert sorted(expand_pattern(parse_pattern("*a*"), 3)) == ["??a", "?a?", "a??"]
+
+
+def test_query_matches_regex():
+    index = PatternIndex(WORDS)
+    for pattern in ["b?a*st", "*ast", "b*", "?e*", "*a*s*", "b??t", "*"]:
+        for min_length, max_length in [(1, 20), (4, 8), (5, 5)]:
+            result = list(index.query(pattern, min_length, max_length))
+            assert result == brute_force(pattern, min_length, max_length), pattern
+    # without a '*' the pattern fixes the length
+    assert list(index.query("b??t")) == ["bast", "beat", "best"]
+
+
+def test_query_rack():
+    index = PatternIndex(WORDS)
+    # the fixed letters are on the board, only the open positions use the rack
+    assert list(index.query("b?a*st", rack="eor")) == ["beast", "boast"]
+    assert list(index.query("b?a*st", rack="e")) == ["beast"]
+    assert list(index.query("b?a*st", rack="e.")) == ["beast", "blast", "boast"]
+    assert list(index.query("b*st", max_length=7, rack="al")) == ["bast", "blast"]
+    # ballast needs two a's and two l's
+    assert list(index.query("b*st", max_length=7, rack="all.")) == [
+        "bast",
+        "best",
+        "beast",
+        "blast",
+        "boast",
+        "ballast",
+    ]
+
+
+def test_query_limit_is_lazy():
+    index = PatternIndex(WORDS)
+    assert list(index.query("*", limit=3)) == ["bat", "bast", "bats"]
+    results = index.query("b*")
+    assert next(results) == "bat"
+    assert next(results) == "bast"
+
+
+if __name__ == "__main__":
+    test_expand_pattern()
+    test_query_matches_regex()
+    test_query_rack()
+    test_query_limit_is_lazy()
@@ -0,0 +1,62 @@
+import argparse
+import time
+from pathlib import Path
+
+from wordlebot import AbsurdleHost, MinimaxWordScorer, WordleBot, EMOJI_MAP
+from wordlebot.absurdle import play_absurdle, response_to_code, ALL_CORRECT_CODE
+import pandas as pd
+
+CUR_DIR = Path(__file__).parent
+RESOURCE_DIR = CUR_DIR / "resources"
+
+
+def print_response(guess_response):
+    guess = "".join([letter_guess.letter for letter_guess in guess_response])
+    emoji = "".join([EMOJI_MAP[letter_guess.state] for letter_guess in guess_response])
+    print(f"{guess} {emoji}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play Wordle against a host that never commits to an answer"
+    )
+    parser.add_argument(
+        "--solver",
+        action="store_true",
+        help="let WordleBot play, choosing guesses that minimize the worst case",
+    )
+    args = parser.parse_args()
+
+    word_bank = pd.read_csv(RESOURCE_DIR / "word-bank.csv", names=["word"])
+    words = list(word_bank.word.values)
+    valid_words = set(
+        pd.read_csv(RESOURCE_DIR / "valid-words.csv", names=["word"]).word.values
+    )
+    host = AbsurdleHost(words)
+
+    if args.solver:
+        wordle_bot = WordleBot(
+            word_to_freq={word: 1 for word in words},
+            word_scorer=MinimaxWordScorer(words),
+        )
+        responses = play_absurdle(host, wordle_bot)
+        for guess_response in responses:
+            print_response(guess_response)
+        print(f"WordleBot won in {len(responses)} guesses!")
+    else:
+        n_guesses = 0
+        while True:
+            print(f"{len(host.candidates)} possible words remain, enter a guess")
+            guess = input().strip().lower()
+            if guess not in valid_words:
+                print(f"{guess} is not a valid word")
+                continue
+            n_guesses += 1
+            start = time.perf_counter()
+            guess_response = host.respond(guess)
+            host_ms = 1000 * (time.perf_counter() - start)
+            print_response(guess_response)
+            print(f"(host took {host_ms:.1f}ms)")
+            if response_to_code(guess_response) == ALL_CORRECT_CODE:
+                print(f"You won in {n_guesses} guesses!")
+                break
@@ -1,5 +1,11 @@
 import argparse
-from typing import List
+import contextlib
+import io
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from wordlebot import (
     WordleBot,
@@ -13,13 +19,29 @@ from wordlebot import (
 import pandas as pd
 
 
-def play_word(wordle_bot: WordleBot, true_word, initial_word: str = None) -> int:
-    """play a fake game against 'true_word', and return the number of tries needed to win"""
+CUR_DIR = Path(__file__).parent
+RESOURCE_DIR = CUR_DIR / "resources"
+
+
+def play_word(
+    wordle_bot: WordleBot,
+    true_word,
+    initial_word: str = None,
+    suggest_seconds: Optional[Dict[int, List[float]]] = None,
+) -> int:
+    """play a fake game against 'true_word', and return the number of tries needed to win.
+    If suggest_seconds is given, the time taken by each suggestion is appended to
+    suggest_seconds[guess_idx]."""
     for guess_idx in range(1, 7):
         if guess_idx == 1 and initial_word:
             guess_word = initial_word
         else:
+            start = time.perf_counter()
             guess_word = wordle_bot.suggest()
+            if suggest_seconds is not None:
+                suggest_seconds.setdefault(guess_idx, []).append(
+                    time.perf_counter() - start
+                )
         print(f"playing word {guess_word}")
         guess_response = generate_guess_response(
             guess_word=guess_word, true_word=true_word
@@ -44,31 +66,111 @@ def play_word(wordle_bot: WordleBot, true_word, initial_word: str = None) -> int
     return -1
 
 
+def make_word_scorer(scorer: str, words: List[str]):
+    if scorer == "brute_force":
+        return BruteForceWordScorer()
+    elif scorer == "fast_brute_force":
+        return FastBruteForceWordScorer(words)
+    elif scorer == "frequency":
+        return FrequencyWordScorer()
+    raise ValueError(f"Unknown scorer {scorer}")
+
+
+def simulate(
+    word_to_freq: Dict[str, float],
+    true_words: List[str],
+    scorer: str,
+    initial_word: Optional[str] = None,
+    hard_mode: bool = False,
+) -> Dict:
+    """Play a game against each of true_words with a fresh WordleBot, returning the
+    number of guesses for each game (-1 for a loss) and the suggestion times by turn"""
+    guesses = []
+    suggest_seconds: Dict[int, List[float]] = {}
+    for true_word in true_words:
+        wordle_bot = WordleBot(
+            word_to_freq=word_to_freq,
+            word_scorer=make_word_scorer(scorer, list(word_to_freq.keys())),
+            hard_mode=hard_mode,
+        )
+        # the bot and scorers print as they go, which is too much for a batch
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            guesses.append(
+                play_word(wordle_bot, true_word, initial_word, suggest_seconds)
+            )
+    return {"guesses": guesses, "suggest_seconds": suggest_seconds}
+
+
+def print_simulation(results: Dict, hard_mode: bool):
+    guesses = results["guesses"]
+    wins = [n for n in guesses if n > 0]
+    print(f"{'Hard' if hard_mode else 'Normal'} mode, {len(guesses)} games")
+    print(f"Won {len(wins)}, lost {len(guesses) - len(wins)}")
+    if wins:
+        print(f"Mean guesses to win: {sum(wins) / len(wins):.3f}")
+    for n in range(1, 7):
+        print(f"{n}: {wins.count(n)}")
+    for guess_idx, seconds in sorted(results["suggest_seconds"].items()):
+        print(
+            f"Guess {guess_idx}: mean suggestion time {sum(seconds) / len(seconds):.4f}s"
+            f" over {len(seconds)} games"
+        )
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("true_word")
+    parser.add_argument("true_word", nargs="?")
     parser.add_argument("--scorer", default="brute_force")
     parser.add_argument("--initial_word", default="cares")
+    parser.add_argument(
+        "--hard_mode",
+        action="store_true",
+        help="every guess must use the green and yellow letters revealed so far",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=None,
+        help="instead of playing true_word, play this many randomly chosen words and "
+        "report the results",
+    )
+    parser.add_argument("--seed", type=int, default=0)
     args = parser.parse_args()
 
-    wordle_word_freq = pd.read_csv("wordle_word_freq.csv")
-    word_to_freq = {
-        word: freq
-        for word, freq in zip(
-            wordle_word_freq.word.values, wordle_word_freq["count"].values
-        )
-    }
-
-    if args.scorer == "brute_force":
-        word_scorer = BruteForceWordScorer()
-    elif args.scorer == "fast_brute_force":
-        word_scorer = FastBruteForceWordScorer(list(word_to_freq.keys()))
-    elif args.scorer == "frequency":
-        word_scorer = FrequencyWordScorer()
+    if os.path.exists("wordle_word_freq.csv"):
+        wordle_word_freq = pd.read_csv("wordle_word_freq.csv")
+        word_to_freq = {
+            word: freq
+            for word, freq in zip(
+                wordle_word_freq.word.values, wordle_word_freq["count"].values
+            )
+        }
     else:
-        raise ValueError(f"Unknown scorer {args.scorer}")
+        # as in run_wordlebot.py
+        wordle_words = pd.read_csv(RESOURCE_DIR / "word-bank.csv", names=["word"])
+        word_to_freq = {word: 1 for word in wordle_words.word.values}
 
-    # word_scorer = FrequencyWordScorer()
-    wordle_bot = WordleBot(word_to_freq=word_to_freq, word_scorer=word_scorer)
-    play_word(wordle_bot, args.true_word, initial_word=args.initial_word)
+    if args.batch is not None:
+        true_words = random.Random(args.seed).sample(
+            sorted(word_to_freq.keys()), args.batch
+        )
+        results = simulate(
+            word_to_freq,
+            true_words,
+            args.scorer,
+            initial_word=args.initial_word,
+            hard_mode=args.hard_mode,
+        )
+        print_simulation(results, args.hard_mode)
+    else:
+        if args.true_word is None:
+            parser.error("true_word is required unless --batch is given")
+        wordle_bot = WordleBot(
+            word_to_freq=word_to_freq,
+            word_scorer=make_word_scorer(args.scorer, list(word_to_freq.keys())),
+            hard_mode=args.hard_mode,
+        )
+        play_word(wordle_bot, args.true_word, initial_word=args.initial_word)
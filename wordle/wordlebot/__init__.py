@@ -1,5 +1,6 @@
 from .wordlebot import (
     WordState,
+    HardModeState,
     WordleBot,
     GuessState,
     generate_guess_response,
@@ -7,16 +8,21 @@ from .wordlebot import (
 )
 from .brute_force_scorer import BruteForceWordScorer, FastBruteForceWordScorer
 from .frequency_word_scorer import FrequencyWordScorer
+from .minimax_scorer import MinimaxWordScorer
+from .absurdle import AbsurdleHost
 
 
 __all__ = [
     "FrequencyWordScorer",
     "WordState",
+    "HardModeState",
     "WordleBot",
     "EMOJI_MAP",
     "FrequencyWordScorer",
     "BruteForceWordScorer",
     "FastBruteForceWordScorer",
+    "MinimaxWordScorer",
+    "AbsurdleHost",
     "GuessState",
     "generate_guess_response",
 ]
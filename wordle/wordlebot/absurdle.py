@@ -0,0 +1,112 @@
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .wordlebot import (
+    GuessState,
+    LetterGuess,
+    ALPHABET,
+    WORD_LENGTH,
+)
+
+# feedback for a guess as a base 3 number, digit i is the GuessState value of letter i
+N_FEEDBACK_CODES = 3**WORD_LENGTH
+_POSITION_WEIGHTS = 3 ** np.arange(WORD_LENGTH)
+ALL_CORRECT_CODE = int(GuessState.CORRECT.value * _POSITION_WEIGHTS.sum())
+
+
+def words_to_array(words: Iterable[str]) -> np.ndarray:
+    """(N, WORD_LENGTH) array of letter indices"""
+    words = list(words)
+    if not words:
+        return np.zeros((0, WORD_LENGTH), dtype=np.int8)
+    codes = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+    return (codes - ord(ALPHABET[0])).astype(np.int8).reshape(len(words), WORD_LENGTH)
+
+
+def letter_presence(word_array: np.ndarray) -> np.ndarray:
+    """(N, 26) boolean array, True where the letter appears anywhere in the word"""
+    presence = np.zeros((len(word_array), len(ALPHABET)), dtype=bool)
+    presence[np.arange(len(word_array))[:, np.newaxis], word_array] = True
+    return presence
+
+
+def feedback_codes(
+    guess_array: np.ndarray, answer_array: np.ndarray, answer_presence: np.ndarray
+) -> np.ndarray:
+    """Feedback codes for guesses against every answer, with the same rules as
+    generate_guess_response: a letter is CORRECT in the right position, otherwise
+    IN_WORD if it appears anywhere in the answer.
+
+    guess_array is (WORD_LENGTH,) for one guess, giving (N,) codes, or (G, WORD_LENGTH)
+    for several, giving (G, N) codes.
+    """
+    guesses = guess_array.reshape(-1, 1, WORD_LENGTH)
+    correct = guesses == answer_array[np.newaxis, :, :]
+    # present[g, n, i] is answer_presence[n, guesses[g, 0, i]]
+    present = answer_presence[:, guesses[:, 0, :]].transpose(1, 0, 2)
+    states = np.where(correct, GuessState.CORRECT.value, present.astype(np.int64))
+    codes = states @ _POSITION_WEIGHTS
+    return codes[0] if guess_array.ndim == 1 else codes
+
+
+def code_to_response(guess: str, code: int) -> List[LetterGuess]:
+    return [
+        LetterGuess(letter=letter, state=GuessState(code // 3**position % 3))
+        for position, letter in enumerate(guess)
+    ]
+
+
+def response_to_code(guess_response: Sequence[LetterGuess]) -> int:
+    return sum(
+        guess.state.value * 3**position for position, guess in enumerate(guess_response)
+    )
+
+
+def largest_bucket(codes: np.ndarray) -> Tuple[int, int]:
+    """The feedback code shared by the most answers and how many share it.  Ties go to
+    the lowest code, which reveals the least."""
+    counts = np.bincount(codes, minlength=N_FEEDBACK_CODES)
+    code = int(np.argmax(counts))
+    return code, int(counts[code])
+
+
+class AbsurdleHost:
+    """Wordle host with no fixed answer.  Each guess splits the words still consistent
+    with every reply so far by the feedback they would give, and the host replies with
+    the feedback of the largest group, which become the remaining candidates.  The
+    game is won once a guess is the only candidate left."""
+
+    def __init__(self, words: Iterable[str]):
+        self.candidates = sorted(words)
+        self._candidate_array = words_to_array(self.candidates)
+        self._candidate_presence = letter_presence(self._candidate_array)
+
+    def respond(self, guess: str) -> List[LetterGuess]:
+        if len(guess) != WORD_LENGTH:
+            raise ValueError(f"Guess {guess} should have {WORD_LENGTH} letters")
+        codes = feedback_codes(
+            words_to_array([guess])[0], self._candidate_array, self._candidate_presence
+        )
+        code, _ = largest_bucket(codes)
+        keep = codes == code
+        self._candidate_array = self._candidate_array[keep]
+        self._candidate_presence = self._candidate_presence[keep]
+        self.candidates = [word for word, k in zip(self.candidates, keep) if k]
+        return code_to_response(guess, code)
+
+
+def play_absurdle(
+    host: AbsurdleHost, wordle_bot, max_guesses: int = 20
+) -> List[List[LetterGuess]]:
+    """Let wordle_bot (a WordleBot, usually with a MinimaxWordScorer) play against
+    host until it wins, returning the host's response to each guess.  Raises
+    RuntimeError if it takes more than max_guesses."""
+    responses = []
+    while len(responses) < max_guesses:
+        guess_response = host.respond(wordle_bot.suggest())
+        responses.append(guess_response)
+        if response_to_code(guess_response) == ALL_CORRECT_CODE:
+            return responses
+        wordle_bot.guess(guess_response)
+    raise RuntimeError(f"No win after {max_guesses} guesses")
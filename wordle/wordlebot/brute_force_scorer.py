@@ -71,7 +71,7 @@ class FastBruteForceWordScorer(WordScorer):
         self, true_word_array: np.ndarray, guess_word_array: np.ndarray
     ):
         """create internal numpy arrays"""
-        letter_state = np.ones((WORD_LENGTH, len(ALPHABET)), dtype=np.bool8)
+        letter_state = np.ones((WORD_LENGTH, len(ALPHABET)), dtype=np.bool_)
         required_letters = set()
         # guess_array = self._word_to_indices(guess_word)
         # true_array = self._word_to_indices(true_word)
@@ -0,0 +1,77 @@
+from typing import Dict, List
+
+import numpy as np
+
+from .wordlebot import WordScorer, WordleBot
+from .absurdle import (
+    N_FEEDBACK_CODES,
+    feedback_codes,
+    letter_presence,
+    response_to_code,
+    words_to_array,
+)
+
+# guesses per vectorized pass, to bound the size of the (guesses, candidates) arrays
+CHUNK_SIZE = 256
+
+
+class MinimaxWordScorer(WordScorer):
+    """Scores words by the size of the largest group of candidates that would get the
+    same feedback, smaller being better.  This is the best guess against a host that
+    always picks the worst feedback, like AbsurdleHost.
+
+    The candidates are the words that would have given exactly the feedback seen for
+    every guess so far, which can be fewer than WordleBot.possible_words.  All the
+    guess words are scored in update(), a chunk of guesses at a time.
+    """
+
+    def __init__(self, all_words: List[str]):
+        self.all_words = sorted(all_words)
+        self.all_words_array = words_to_array(self.all_words)
+        self.all_words_presence = letter_presence(self.all_words_array)
+        self.scores: Dict[str, float] = {}
+
+    def _candidates(self, wordle_bot: WordleBot) -> np.ndarray:
+        keep = np.ones(len(self.all_words), dtype=bool)
+        for guess_response in wordle_bot.guess_history:
+            guess = "".join(letter_guess.letter for letter_guess in guess_response)
+            codes = feedback_codes(
+                words_to_array([guess])[0],
+                self.all_words_array,
+                self.all_words_presence,
+            )
+            keep &= codes == response_to_code(guess_response)
+        return keep
+
+    def update(self, wordle_bot: WordleBot) -> None:
+        keep = self._candidates(wordle_bot)
+        candidate_array = self.all_words_array[keep]
+        candidate_presence = self.all_words_presence[keep]
+        is_candidate = dict(zip(self.all_words, keep))
+
+        guesses = sorted(wordle_bot.all_words)
+        guess_array = words_to_array(guesses)
+        self.scores = {}
+        for start in range(0, len(guesses), CHUNK_SIZE):
+            chunk = guess_array[start : start + CHUNK_SIZE]
+            codes = feedback_codes(chunk, candidate_array, candidate_presence)
+            # count each guess's codes in one bincount by offsetting each row
+            offsets = np.arange(len(chunk))[:, np.newaxis] * N_FEEDBACK_CODES
+            counts = np.bincount(
+                (codes + offsets).ravel(), minlength=len(chunk) * N_FEEDBACK_CODES
+            ).reshape(len(chunk), N_FEEDBACK_CODES)
+            worst = counts.max(axis=1)
+            n_groups = (counts > 0).sum(axis=1)
+            for idx, (w, n) in enumerate(zip(worst, n_groups), start):
+                word = guesses[idx]
+                # break ties in favour of guesses that could win, then of guesses that
+                # split the candidates into more groups, then alphabetically
+                self.scores[word] = (
+                    -float(w)
+                    + 0.5 * is_candidate.get(word, False)
+                    + n / 1000
+                    - idx * 1e-8
+                )
+
+    def score_word(self, word: str) -> float:
+        return self.scores[word]
@@ -1,4 +1,35 @@
-from wordle.wordlebot import generate_guess_response, GuessState, WordState
+from wordle.wordlebot import (
+    generate_guess_response,
+    GuessState,
+    WordState,
+    HardModeState,
+    WordleBot,
+    FrequencyWordScorer,
+    MinimaxWordScorer,
+    AbsurdleHost,
+)
+from wordle.wordlebot.absurdle import (
+    feedback_codes,
+    letter_presence,
+    play_absurdle,
+    response_to_code,
+    words_to_array,
+)
+
+ANIMALS = [
+    "zebra",
+    "moose",
+    "birds",
+    "robin",
+    "snake",
+    "mouse",
+    "tapir",
+    "sheep",
+    "goose",
+    "house",
+    "spine",
+    "noise",
+]
 
 
 def test_generate_guess_response():
@@ -47,6 +78,104 @@ def test_word_state():
     assert set(filtered_words) == set(expected_words)
 
 
+def test_hard_mode_state():
+    vocab = ["mouse", "moose", "snake", "spine", "sauce", "tapir", "oases", "house"]
+    ws = HardModeState()
+    # s is yellow and e is green, everything else is grey
+    ws.update_state(generate_guess_response(guess_word="snake", true_word="mouse"))
+    # grey letters may be played again and s may go back where it was
+    expected_words = ["mouse", "moose", "snake", "spine", "sauce", "house"]
+    assert set(ws.get_possible_words(vocab)) == set(expected_words)
+
+
+def test_hard_mode_suggest():
+    wordle_bot = WordleBot(
+        word_to_freq={word: 1 for word in ANIMALS},
+        word_scorer=FrequencyWordScorer(),
+        hard_mode=True,
+    )
+    assert wordle_bot.legal_guesses == set(ANIMALS)
+    wordle_bot.guess(generate_guess_response(guess_word="snake", true_word="mouse"))
+    assert wordle_bot.possible_words == {"moose", "goose", "mouse", "house"}
+    assert wordle_bot.legal_guesses == {
+        "snake",
+        "spine",
+        "noise",
+        "moose",
+        "goose",
+        "mouse",
+        "house",
+    }
+    assert wordle_bot.suggest() in wordle_bot.legal_guesses
+
+    # the legal pool only ever shrinks, and always holds the possible words
+    wordle_bot.guess(generate_guess_response(guess_word="noise", true_word="mouse"))
+    assert wordle_bot.possible_words <= wordle_bot.legal_guesses
+    assert wordle_bot.legal_guesses <= {"noise", "moose", "goose", "mouse", "house"}
+
+
+def test_feedback_codes():
+    answers = words_to_array(ANIMALS)
+    presence = letter_presence(answers)
+    codes = feedback_codes(words_to_array(["sheep", "eerie"]), answers, presence)
+    for gidx, guess in enumerate(["sheep", "eerie"]):
+        single_codes = feedback_codes(words_to_array([guess])[0], answers, presence)
+        assert list(single_codes) == list(codes[gidx])
+        for aidx, answer in enumerate(ANIMALS):
+            expected = response_to_code(generate_guess_response(guess, answer))
+            assert codes[gidx, aidx] == expected
+
+
+def test_absurdle_host():
+    host = AbsurdleHost(ANIMALS)
+    # "sheep" splits the animals into groups by feedback, the largest is the words
+    # with an s and e but no h or p, with s and e not in the guessed positions
+    guess_response = host.respond("sheep")
+    states = [letter_guess.state for letter_guess in guess_response]
+    assert host.candidates == ["goose", "moose", "mouse", "noise"]
+    assert states == [
+        GuessState.IN_WORD,
+        GuessState.NOT_IN_WORD,
+        GuessState.IN_WORD,
+        GuessState.IN_WORD,
+        GuessState.NOT_IN_WORD,
+    ]
+    for word in host.candidates:
+        assert generate_guess_response("sheep", word) == guess_response
+
+
+def test_minimax_solver():
+    wordle_bot = WordleBot(
+        word_to_freq={word: 1 for word in ANIMALS},
+        word_scorer=MinimaxWordScorer(ANIMALS),
+    )
+    host = AbsurdleHost(ANIMALS)
+    responses = play_absurdle(host, wordle_bot)
+    assert all(
+        letter_guess.state == GuessState.CORRECT for letter_guess in responses[-1]
+    )
+    assert len(responses) <= 4
+    # the first guess is the one with the smallest worst case
+    wordle_bot = WordleBot(
+        word_to_freq={word: 1 for word in ANIMALS},
+        word_scorer=MinimaxWordScorer(ANIMALS),
+    )
+    first_guess = wordle_bot.suggest()
+    answers = words_to_array(ANIMALS)
+    presence = letter_presence(answers)
+
+    def worst_case(guess):
+        codes = feedback_codes(words_to_array([guess])[0], answers, presence)
+        return max(list(codes).count(code) for code in codes)
+
+    assert worst_case(first_guess) == min(worst_case(word) for word in ANIMALS)
+
+
 if __name__ == "__main__":
     test_generate_guess_response()
     test_word_state()
+    test_hard_mode_state()
+    test_hard_mode_suggest()
+    test_feedback_codes()
+    test_absurdle_host()
+    test_minimax_solver()
@@ -98,6 +98,19 @@ class WordState:
         return possible_words
 
 
+class HardModeState(WordState):
+    """The hints hard mode requires every guess to use: revealed green letters must
+    stay in place and yellow letters must be used somewhere.  Unlike WordState, a guess
+    may reuse grey letters and put yellow letters back in the same position."""
+
+    def update_state(self, guess_response: List[LetterGuess]):
+        for position, guess in enumerate(guess_response):
+            if guess.state == GuessState.CORRECT:
+                self.state[position].set_letter(guess.letter)
+            elif guess.state == GuessState.IN_WORD:
+                self.required_letters.add(guess.letter)
+
+
 class WordScorer:
     """Interface for classes that score words"""
 
@@ -123,14 +136,26 @@ def generate_guess_response(guess_word: str, true_word: str) -> List[LetterGuess
 
 
 class WordleBot:
-    def __init__(self, word_to_freq: Dict[str, float], word_scorer: WordScorer):
+    def __init__(
+        self,
+        word_to_freq: Dict[str, float],
+        word_scorer: WordScorer,
+        hard_mode: bool = False,
+    ):
+        """If hard_mode is set, suggestions always use the hints revealed so far, see
+        HardModeState"""
         self.word_to_freq = word_to_freq
         self.word_scorer = word_scorer
+        self.hard_mode = hard_mode
         self.letter_state = {letter: LetterState.UNKNOWN for letter in ALPHABET}
         self.word_state = WordState()
+        self.hard_mode_state = HardModeState()
         self.guess_history: List[List[LetterGuess]] = []
 
         self.possible_words = set(word_to_freq.keys())
+        # words that can legally be guessed in hard mode, filtered along with
+        # possible_words as hints are revealed
+        self.legal_guesses = set(word_to_freq.keys())
 
     def guess(self, guess_response: List[LetterGuess]) -> None:
 
@@ -146,6 +171,7 @@ class WordleBot:
                 self.letter_state[guess.letter] = LetterState.IN_WORD
 
             self.word_state.update_state(guess_response)
+        self.hard_mode_state.update_state(guess_response)
         self._update_possible_words()
 
     @property
@@ -154,6 +180,10 @@ class WordleBot:
 
     def _update_possible_words(self):
         self.possible_words = self.word_state.get_possible_words(self.possible_words)
+        if self.hard_mode:
+            self.legal_guesses = self.hard_mode_state.get_possible_words(
+                self.legal_guesses
+            )
 
     def _score_words(self, word_list: Iterable[str]) -> List[Tuple[str, float]]:
         self.word_scorer.update(self)
@@ -165,7 +195,12 @@ class WordleBot:
         return scored_words
 
     def suggest(self) -> str:
-        words = self.all_words if len(self.possible_words) > 2 else self.possible_words
+        if len(self.possible_words) <= 2:
+            words = self.possible_words
+        elif self.hard_mode:
+            words = self.legal_guesses
+        else:
+            words = self.all_words
         scored = self._score_words(words)
         word, score = scored[0]
         print(f"suggested word {word} has score {score}")